@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+from app.chat.embeddings import get_embeddings
+from app.chat.retrievers.bm25 import tokenize
+from app.web.api import add_cached_answer, get_cached_answers, record_cached_answer_hit
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+
+
+def scope_key(document_ids: List[str], template: Optional[str]) -> str:
+    scope = json.dumps([sorted(set(document_ids)), template or ""])
+    return hashlib.sha256(scope.encode("utf-8")).hexdigest()
+
+
+def identifiers(question: str) -> frozenset:
+    # NOTE: Terms with a digit, such as E1234, 4.2.1 or 2023. Embeddings barely
+    # tell them apart, so a cached answer must be for exactly the same ones:
+    return frozenset(term for term in tokenize(question) if any(char.isdigit() for char in term))
+
+
+@dataclass
+class CachedHit:
+    id: str
+    answer: str
+    score: float
+
+
+class AnswerCache:
+    """
+    Answers to earlier questions over the same documents and template.
+    A condensed question whose embedding is within `threshold` cosine
+    similarity of a stored one, and that names the same numbers and
+    identifiers, gets the stored answer back.
+    """
+
+    def __init__(self, embeddings, document_ids: List[str], template: Optional[str] = None,
+                 threshold: float = ANSWER_CACHE_THRESHOLD, max_entries: int = ANSWER_CACHE_MAX_ENTRIES):
+        self.embeddings = embeddings
+        self.document_ids = document_ids
+        self.template = template
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.scope = scope_key(document_ids, template)
+
+    def _vector(self, question: str) -> np.ndarray:
+        # NOTE: The retriever embeds the same question next, the query cache makes that free:
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def lookup(self, question: str) -> Optional[CachedHit]:
+        entries = get_cached_answers(self.scope)
+        if not entries:
+            return None
+        vector = self._vector(question)
+        # NOTE: Entries written with another embedding model have another width:
+        entries = [entry for entry in entries if len(entry["embedding"]) == vector.nbytes]
+        if not entries:
+            return None
+        matrix = np.frombuffer(b"".join(entry["embedding"] for entry in entries), dtype=np.float32)
+        scores = matrix.reshape(len(entries), -1) @ vector
+        wanted = identifiers(question)
+        for best in np.argsort(-scores).tolist():
+            if scores[best] < self.threshold:
+                return None
+            if identifiers(entries[best]["question"]) != wanted:
+                continue
+            record_cached_answer_hit(entries[best]["id"])
+            return CachedHit(id=entries[best]["id"], answer=entries[best]["answer"], score=float(scores[best]))
+        return None
+
+    def store(self, question: str, answer: str) -> None:
+        add_cached_answer(
+            scope=self.scope,
+            document_ids=self.document_ids,
+            template=self.template,
+            question=question,
+            answer=answer,
+            embedding=self._vector(question).tobytes(),
+            max_entries=self.max_entries,
+        )
+
+
+def build_answer_cache(chat_args) -> Optional[AnswerCache]:
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    return AnswerCache(get_embeddings(), chat_args.document_id, chat_args.template)
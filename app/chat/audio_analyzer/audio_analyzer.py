@@ -14,6 +14,7 @@ from .rest_helper import *
 from .user_config_helper import *
 from .audio_embeddings import *
 from .save_transcript import *
+from app.chat.progress import ProgressTracker
 import pprint
 
 # This should not change unless you switch to a new version of the Speech REST API.
@@ -232,20 +233,28 @@ def format_text(text, max_chars_per_line=120):
     formatted_text = '\n'.join(formatted_lines)
     return formatted_text
 
-def print_full_output(output_file_path : str, transcription : Dict, sentiment_confidence_scores : List[Dict], phrases : List[TranscriptionPhrase], document_id : str) -> None :
+def format_turns(phrases : List[TranscriptionPhrase]) -> str :
+    # NOTE: One labelled line per phrase, the transcript chunker splits on these labels:
+    return "\n".join(f"Speaker {phrase.speaker_number + 1}: {phrase.text.strip()}" for phrase in phrases if phrase.text.strip())
+
+def print_full_output(output_file_path : str, transcription : Dict, sentiment_confidence_scores : List[Dict], phrases : List[TranscriptionPhrase], document_id : str, user_id : str, tracker = None) -> None :
 
     final_transcription = merge_sentiment_confidence_scores_into_transcription(transcription, sentiment_confidence_scores)
     pprint.pp(final_transcription)
     with open(output_file_path, mode = "w", newline = "") as f :
         f.write(format_text(final_transcription["combinedRecognizedPhrases"][0]["display"]))
-    audio_embeddings(output_file_path, document_id)
-    sent_transcript_to_blob_storage(output_file_path)
+    # NOTE: The stored transcript keeps its format, the speaker turns are only used for chunking:
+    audio_embeddings(output_file_path, document_id, tracker, turns=format_turns(phrases) or None)
+    sent_transcript_to_blob_storage(output_file_path, user_id)
 
-def run_audio_analyzer(input_file_path:str, output_file_path:str, document_id:str) -> None :
+def run_audio_analyzer(input_file_path:str, output_file_path:str, document_id:str, user_id:str, tracker = None) -> None :
+    tracker = tracker or ProgressTracker()
     user_config = user_config_from_args(input_file_path, output_file_path )
     transcription : Dict
     transcription_id : str
-    if user_config["input_audio_url"] is not None :
+    if user_config["input_audio_url"] is None :
+        raise Exception(f"Missing input audio URL.{linesep}")
+    with tracker.stage("parse") :
         transcription_id = create_transcription(user_config)
         wait_for_transcription(transcription_id, user_config)
         print(f"Transcription ID: {transcription_id}")
@@ -253,14 +262,11 @@ def run_audio_analyzer(input_file_path:str, output_file_path:str, document_id:st
         transcription_uri = get_transcription_uri(transcription_files, user_config)
         print(f"Transcription URI: {transcription_uri}")
         transcription = get_transcription(transcription_uri)
-    else :
-        raise Exception(f"Missing input audio URL.{linesep}")
-    # For stereo audio, the phrases are sorted by channel number, so resort them by offset.
-    transcription["recognizedPhrases"] = sorted(transcription["recognizedPhrases"], key=lambda phrase : phrase["offsetInTicks"])
-    phrases = get_transcription_phrases(transcription, user_config)
-    sentiment_analysis_results = get_sentiment_analysis(phrases, user_config)
-    sentiment_confidence_scores = get_sentiment_confidence_scores(sentiment_analysis_results)
+        # For stereo audio, the phrases are sorted by channel number, so resort them by offset.
+        transcription["recognizedPhrases"] = sorted(transcription["recognizedPhrases"], key=lambda phrase : phrase["offsetInTicks"])
+        phrases = get_transcription_phrases(transcription, user_config)
+        sentiment_analysis_results = get_sentiment_analysis(phrases, user_config)
+        sentiment_confidence_scores = get_sentiment_confidence_scores(sentiment_analysis_results)
+    tracker.incr(pages=len(phrases))
     if user_config["output_file_path"] is not None :
-        print_full_output(user_config["output_file_path"], transcription, sentiment_confidence_scores, phrases, document_id)
-
-
+        print_full_output(user_config["output_file_path"], transcription, sentiment_confidence_scores, phrases, document_id, user_id, tracker)
@@ -1,15 +1,15 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
 from langchain_community.document_loaders import  TextLoader
-from app.chat.vector_stores.pinecone import vector_store
-from app.chat.embeddings.openai import embeddings
+from app.chat.chunking import build_chunker
+from app.chat.ingest import split_pages, ingest_chunks
+from app.chat.progress import ProgressTracker
 
-def audio_embeddings(file_path, document_id):
-    loader = TextLoader(file_path)
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
-    docs = loader.load_and_split(text_splitter)
-    for doc in docs:
-        doc.metadata = {
-            "text": doc.page_content,
-            "doc_id": document_id
-        }
-    vector_store.add_documents(docs)
\ No newline at end of file
+def audio_embeddings(file_path, document_id, tracker=None, turns=None):
+    tracker = tracker or ProgressTracker()
+    # NOTE: `turns` is the transcript as labelled speaker turns, chunked in place of the file's wrapped text:
+    if turns is not None:
+        pages = [Document(page_content=turns, metadata={"source": file_path})]
+    else:
+        pages = TextLoader(file_path).lazy_load()
+    chunks = split_pages(pages, build_chunker("transcript"), tracker)
+    ingest_chunks(document_id, chunks, tracker)
@@ -1,24 +1,61 @@
+import re
+from queue import Full
+from threading import Event
 from typing import Any, Dict, List
 from uuid import UUID
 from langchain.callbacks.base import BaseCallbackHandler
 from langchain_core.messages import BaseMessage
 
+
+class StreamCancelled(Exception):
+    pass
+
+
+class StreamStalled(Exception):
+    pass
+
+
 class StreamingHandler(BaseCallbackHandler):
-    def __init__(self, queue):
+    # NOTE: Lets StreamCancelled out of on_llm_new_token, which aborts the LLM call:
+    raise_error = True
+
+    def __init__(self, queue, cancelled=None, stall_seconds=None):
         self.queue = queue
+        self.cancelled = cancelled or Event()
+        self.stall_seconds = stall_seconds
         self.streaming_run_ids = set()
+
+    def put(self, item, stall_seconds=None):
+        # NOTE: The queue is bounded, a slow client makes generation wait here,
+        # for at most `stall_seconds` when given:
+        waited = 0.0
+        while True:
+            if self.cancelled.is_set():
+                raise StreamCancelled()
+            try:
+                self.queue.put(item, timeout=0.5)
+                return
+            except Full:
+                waited += 0.5
+                if stall_seconds is not None and waited >= stall_seconds:
+                    raise StreamStalled(f"The client read nothing for {stall_seconds:g} seconds.")
     
     def on_chat_model_start(self, serialized, messages, run_id, **kwargs):
-        if serialized["kwargs"]["streaming"]:
+        if (serialized or {}).get("kwargs", {}).get("streaming"):
             self.streaming_run_ids.add(run_id)
     
     def on_llm_new_token(self, token, **kwargs):
-        self.queue.put(token)
+        # NOTE: The LLM response, and its request slot, stay open while this
+        # waits, a stalled reader aborts the call instead of holding them:
+        self.put(token, self.stall_seconds)
 
     def on_llm_end(self, response, run_id, **kwargs):
         if run_id in self.streaming_run_ids:
-            self.queue.put(None)
+            self.put(None)
             self.streaming_run_ids.remove(run_id)
 
-    def on_llm_error(self, error, **kwargs):
-        self.queue.put(None)
\ No newline at end of file
+    def replay(self, text):
+        # NOTE: Streams a cached answer word by word, as if the LLM produced it:
+        for token in re.findall(r"\s*\S+", text):
+            self.put(token)
+        self.put(None)
@@ -0,0 +1,44 @@
+import os
+import re
+from app.chat.retrievers.bm25 import tokenize
+
+# NOTE: always condenses every follow-up, fast skips self-contained ones and
+# speculative also retrieves on the raw question while condensing:
+CONDENSE_MODE = os.getenv("CONDENSE_MODE", "fast").lower()
+CONDENSE_SIMILARITY = float(os.getenv("CONDENSE_SIMILARITY", "0.8"))
+
+# NOTE: Anaphora that point back into the conversation. Plain "this", "that",
+# "one" or "other" are too common in self-contained questions to count, only
+# "this one", "the above" or a trailing "this"/"that" do:
+REFERENCES = re.compile(
+    r"\b(it|its|they|them|their|theirs|these|those|he|she|him|his|her|hers)\b"
+    r"|\bthe (above|previous|former|latter|same one|last one)\b"
+    r"|\b(this|that) one\b"
+    r"|\b(this|that|again)\s*[?.!]*\s*$",
+    re.IGNORECASE,
+)
+FOLLOW_UP = re.compile(r"^\s*(and|but|also|so|then|what about|how about|why not|why|what else|ok|okay)\b", re.IGNORECASE)
+
+
+def user_question(question: str) -> str:
+    # NOTE: The template rides along after "Additional Instructions:", see SqlMessageHistory:
+    return question.split("Additional Instructions:")[0].strip()
+
+
+def is_self_contained(question: str) -> bool:
+    text = user_question(question)
+    if len(text.split()) < 4:
+        return False
+    return not REFERENCES.search(text) and not FOLLOW_UP.search(text)
+
+
+def needs_condensing(question: str, mode: str = CONDENSE_MODE) -> bool:
+    return mode == "always" or not is_self_contained(question)
+
+
+def same_question(raw: str, condensed: str, threshold: float = CONDENSE_SIMILARITY) -> bool:
+    # NOTE: Jaccard similarity of the two questions' terms:
+    left, right = set(tokenize(user_question(raw))), set(tokenize(user_question(condensed)))
+    if not left or not right:
+        return False
+    return len(left & right) / len(left | right) >= threshold
@@ -1,6 +1,103 @@
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from flask import current_app
 from langchain.chains import ConversationalRetrievalChain
+from langchain.chains.conversational_retrieval.base import _get_chat_history
+from langchain_core.callbacks import CallbackManagerForChainRun
+from langchain_core.documents import Document
+from app.chat.callbacks.stream import StreamingHandler
+from app.chat.chains.condense import CONDENSE_MODE, needs_condensing, same_question
 from app.chat.chains.streamable import StreamableChain
 
+# NOTE: Speculative retrievals on the raw question, run while it is condensed
+# (CONDENSE_MODE=speculative), at most SPECULATIVE_WORKERS at a time:
+SPECULATIVE_WORKERS = int(os.getenv("SPECULATIVE_WORKERS", "8"))
+
+_speculative = ThreadPoolExecutor(max_workers=SPECULATIVE_WORKERS, thread_name_prefix="speculative-retrieval")
+
 
 class StreamingConversationalRetrievalChain(StreamableChain, ConversationalRetrievalChain):
-    pass
+    # NOTE: An AnswerCache scoped to this chat's documents and template, or None:
+    answer_cache: Optional[Any] = None
+    # NOTE: One of always, fast or speculative, see app/chat/chains/condense.py:
+    condense_mode: str = CONDENSE_MODE
+
+    def _call(
+        self,
+        inputs: Dict[str, Any],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Dict[str, Any]:
+        # NOTE: ConversationalRetrievalChain._call, with the condense step skipped
+        # for self-contained questions, an optional speculative retrieval while
+        # condensing, and an answer cache lookup before retrieving documents:
+        _run_manager = run_manager or CallbackManagerForChainRun.get_noop_manager()
+        question = inputs["question"]
+        get_chat_history = self.get_chat_history or _get_chat_history
+        chat_history_str = get_chat_history(inputs["chat_history"])
+
+        speculative = None
+        try:
+            if chat_history_str and needs_condensing(question, self.condense_mode):
+                if self.condense_mode == "speculative":
+                    # NOTE: Without this run's callbacks, their handlers are not thread-safe
+                    # and the retrieval may outlive the run when its result is not used:
+                    speculative = _speculative.submit(
+                        self._retrieve_in_context, current_app.app_context(), question, inputs,
+                        CallbackManagerForChainRun.get_noop_manager(),
+                    )
+                new_question = self.question_generator.run(
+                    question=question, chat_history=chat_history_str, callbacks=_run_manager.get_child()
+                )
+            else:
+                new_question = question
+
+            hit = self.answer_cache.lookup(new_question) if self.answer_cache is not None else None
+            if hit is not None:
+                for handler in _run_manager.handlers:
+                    if isinstance(handler, StreamingHandler):
+                        handler.replay(hit.answer)
+                return self._output(hit.answer, [], new_question)
+
+            if speculative is not None and same_question(question, new_question):
+                docs = speculative.result()
+            else:
+                docs = self._retrieve(new_question, inputs, _run_manager)
+        finally:
+            # NOTE: Frees the worker if the retrieval has not started yet, one
+            # already running finishes in the background and is dropped:
+            if speculative is not None:
+                speculative.cancel()
+
+        if self.response_if_no_docs_found is not None and len(docs) == 0:
+            return self._output(self.response_if_no_docs_found, docs, new_question)
+
+        new_inputs = inputs.copy()
+        if self.rephrase_question:
+            new_inputs["question"] = new_question
+        new_inputs["chat_history"] = chat_history_str
+        answer = self.combine_docs_chain.run(
+            input_documents=docs, callbacks=_run_manager.get_child(), **new_inputs
+        )
+        if self.answer_cache is not None:
+            self.answer_cache.store(new_question, answer)
+        return self._output(answer, docs, new_question)
+
+    def _retrieve(self, question: str, inputs: Dict[str, Any], run_manager: CallbackManagerForChainRun) -> List[Document]:
+        if "run_manager" in inspect.signature(self._get_docs).parameters:
+            return self._get_docs(question, inputs, run_manager=run_manager)
+        return self._get_docs(question, inputs)
+
+    def _retrieve_in_context(self, app_context, question, inputs, run_manager) -> List[Document]:
+        # NOTE: Retrieval reads the chunk store, so the thread needs the app context:
+        with app_context:
+            return self._retrieve(question, inputs, run_manager)
+
+    def _output(self, answer, docs, new_question) -> Dict[str, Any]:
+        output: Dict[str, Any] = {self.output_key: answer}
+        if self.return_source_documents:
+            output["source_documents"] = docs
+        if self.return_generated_question:
+            output["generated_question"] = new_question
+        return output
@@ -1,21 +1,82 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
-from queue import Queue
-from threading import Thread
-from app.chat.callbacks.stream import StreamingHandler
+from queue import Empty, Queue
+from threading import BoundedSemaphore, Event
+from app.chat.callbacks.stream import StreamingHandler, StreamCancelled
+
+logger = logging.getLogger(__name__)
+
+# NOTE: Each worker holds an LLM request slot while it streams, so this should not
+# exceed the answering model's LLM_CONCURRENCY, see ModelConcurrencyTransport. The
+# default matches the LLM_CONCURRENCY default, more workers would only wait for a slot:
+STREAM_WORKERS = int(os.getenv("STREAM_WORKERS", "16"))
+# NOTE: Streams admitted beyond the running ones wait for a worker, past that new ones are refused:
+STREAM_MAX_WAITING = int(os.getenv("STREAM_MAX_WAITING", "32"))
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+# NOTE: How long a full token queue may wait on the client before generation is
+# aborted and the LLM request slot released:
+STREAM_STALL_SECONDS = float(os.getenv("STREAM_STALL_SECONDS", "20"))
+
+_executor = ThreadPoolExecutor(max_workers=STREAM_WORKERS, thread_name_prefix="chat-stream")
+_admission = BoundedSemaphore(STREAM_WORKERS + STREAM_MAX_WAITING)
+
+
+class StreamBusy(Exception):
+    pass
+
 
 class StreamableChain:
-    def stream(self, input):
-        queue = Queue()
-        handler = StreamingHandler(queue)
+    def stream(self, input, idle_interval=None):
+        # NOTE: Admission happens here, before the response starts, so the
+        # view can still answer 503:
+        if not _admission.acquire(blocking=False):
+            raise StreamBusy("Too many answers are being generated, try again shortly.")
+        queue = Queue(maxsize=STREAM_QUEUE_SIZE)
+        cancelled = Event()
+        handler = StreamingHandler(queue, cancelled, STREAM_STALL_SECONDS)
 
         def task(app_context):
-            app_context.push()
-            self(input, callbacks=[handler])
-
-        Thread(target=task, args=[current_app.app_context()]).start()
-        
-        while True:
-            token = queue.get()
-            if token is None:
-                break
-            yield token
\ No newline at end of file
+            failure = None
+            try:
+                if cancelled.is_set():
+                    return
+                with app_context:
+                    self(input, callbacks=[handler])
+            except StreamCancelled:
+                pass
+            except Exception as e:
+                logger.exception("Streaming chain failed")
+                failure = e
+            finally:
+                _admission.release()
+                try:
+                    # NOTE: Unblocks the reader whatever happened to the chain, a
+                    # failure goes on the queue so the reader raises it:
+                    handler.put(failure)
+                except StreamCancelled:
+                    pass
+
+        _executor.submit(task, current_app.app_context())
+
+        def tokens():
+            try:
+                while True:
+                    try:
+                        token = queue.get(timeout=idle_interval)
+                    except Empty:
+                        # NOTE: Nothing new yet, lets the caller flush or send a heartbeat:
+                        yield ""
+                        continue
+                    if token is None:
+                        break
+                    if isinstance(token, Exception):
+                        raise token
+                    yield token
+            finally:
+                # NOTE: Also runs when the client disconnects and the server closes
+                # the generator, which stops generation at the next token:
+                cancelled.set()
+
+        return tokens()
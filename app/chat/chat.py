@@ -1,20 +1,39 @@
-from langchain_openai import ChatOpenAI
 from app.chat.models import ChatArgs
-from app.chat.vector_stores.pinecone import build_retriever
-from app.chat.llms.chatopenai import build_llm
-from app.chat.memories.sql_memory import build_memory
+from app.chat.vector_stores import retriever_map, DEFAULT_RETRIEVER
+from app.chat.llms import llm_map, build_llm, get_llm, DEFAULT_LLM, CONDENSE_LLM
+from app.chat.memories import memory_map
 from app.chat.chains.retrieval import StreamingConversationalRetrievalChain
+from app.chat.answer_cache import build_answer_cache
+from app.web.api import get_conversation_components, set_conversation_components
+
+
+def select_components(chat_args: ChatArgs) -> dict:
+    # NOTE: The first message pins the conversation's components, later ones reuse them:
+    components = get_conversation_components(chat_args.conversation_id)
+    if all(components.values()):
+        return components
+    components = {
+        "llm": components["llm"] or DEFAULT_LLM,
+        "retriever": components["retriever"] or DEFAULT_RETRIEVER,
+        "memory": components["memory"] or "sql_buffer_memory",
+    }
+    set_conversation_components(chat_args.conversation_id, **components)
+    return components
 
 
 def build_chat(chat_args: ChatArgs):
-    retriever = build_retriever(chat_args)
-    llm = build_llm(chat_args)
-    condense_question_llm = ChatOpenAI()
-    memory = build_memory(chat_args.conversation_id)
+    components = select_components(chat_args)
+    retriever = retriever_map.get(components["retriever"], retriever_map[DEFAULT_RETRIEVER])(chat_args)
+    # NOTE: A model outside llm_map is still served by the client registry:
+    build = llm_map.get(components["llm"])
+    llm = build(chat_args) if build else build_llm(chat_args, model_name=components["llm"])
+    condense_question_llm = get_llm(CONDENSE_LLM, temperature=0.7)
+    memory = memory_map.get(components["memory"], memory_map["sql_buffer_memory"])(chat_args.conversation_id)
     return StreamingConversationalRetrievalChain.from_llm(
         llm,
         retriever,
         condense_question_llm=condense_question_llm,
         memory=memory,
+        answer_cache=build_answer_cache(chat_args),
         verbose=True
     )
@@ -0,0 +1,23 @@
+import os
+from .strategies import (
+    ChunkReport,
+    TokenChunker,
+    PageChunker,
+    ParagraphChunker,
+    TranscriptChunker,
+)
+
+CHUNK_SIZE_TOKENS = int(os.getenv("CHUNK_SIZE_TOKENS", "512"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+
+chunker_map = {
+    "pdf": PageChunker,
+    "docx": ParagraphChunker,
+    "doc": ParagraphChunker,
+    "txt": TokenChunker,
+    "transcript": TranscriptChunker,
+}
+
+
+def build_chunker(kind: str, chunk_size: int = CHUNK_SIZE_TOKENS, chunk_overlap: int = CHUNK_OVERLAP_TOKENS) -> TokenChunker:
+    return chunker_map.get(kind, TokenChunker)(chunk_size, chunk_overlap)
@@ -0,0 +1,142 @@
+import re
+from dataclasses import dataclass, field
+from typing import List
+from langchain_core.documents import Document
+from .tokens import get_encoding, count_tokens, token_windows
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# NOTE: The label format_turns in app/chat/audio_analyzer builds for chunking, ordinary
+# "Note:" or "Step One:" lines are not turns:
+SPEAKER_TURN = re.compile(r"^Speaker \d+: ")
+
+
+@dataclass
+class ChunkReport:
+    pages: int = 0
+    chunks: int = 0
+    tokens: int = 0
+    max_tokens: int = 0
+    sizes: List[int] = field(default_factory=list, repr=False)
+
+    def add(self, sizes: List[int]) -> None:
+        self.pages += 1
+        self.chunks += len(sizes)
+        self.tokens += sum(sizes)
+        self.max_tokens = max([self.max_tokens, *sizes])
+
+    def as_dict(self) -> dict:
+        return {
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "tokens": self.tokens,
+            "mean_tokens": round(self.tokens / self.chunks, 1) if self.chunks else 0,
+            "max_tokens": self.max_tokens,
+        }
+
+
+class TokenChunker:
+    """
+    Plain-text strategy: fixed windows of `chunk_size` tokens overlapping
+    by `chunk_overlap`. Other strategies first cut the text into natural
+    units and fall back to these windows for units that are too long.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding = get_encoding()
+        self.report = ChunkReport()
+
+    def split_text(self, text: str) -> List[str]:
+        return token_windows(text, self.chunk_size, self.chunk_overlap, self.encoding)
+
+    def split_documents(self, docs: List[Document]) -> List[Document]:
+        chunks = []
+        for doc in docs:
+            texts = [text for text in self.split_text(doc.page_content) if text.strip()]
+            sizes = count_tokens(texts, self.encoding).tolist() if texts else []
+            self.report.add(sizes)
+            chunks += [
+                Document(page_content=text, metadata={**doc.metadata, "tokens": size})
+                for text, size in zip(texts, sizes)
+            ]
+        return chunks
+
+
+class UnitChunker(TokenChunker):
+    """
+    Packs natural units (paragraphs, sections, speaker turns) greedily up
+    to `chunk_size` tokens without splitting them.
+    """
+
+    joiner = "\n\n"
+
+    def units(self, text: str) -> List[str]:
+        return [unit.strip() for unit in PARAGRAPH_BREAK.split(text) if unit.strip()]
+
+    def split_text(self, text: str) -> List[str]:
+        units = self.units(text)
+        if not units:
+            return []
+        sizes = count_tokens(units, self.encoding)
+        chunks, current, current_size = [], [], 0
+        for unit, size in zip(units, sizes.tolist()):
+            if size > self.chunk_size:
+                if current:
+                    chunks.append(self.joiner.join(current))
+                    current, current_size = [], 0
+                chunks += token_windows(unit, self.chunk_size, self.chunk_overlap, self.encoding)
+                continue
+            if current and current_size + size > self.chunk_size:
+                chunks.append(self.joiner.join(current))
+                current, current_size = [], 0
+            current.append(unit)
+            current_size += size
+        if current:
+            chunks.append(self.joiner.join(current))
+        return chunks
+
+
+class PageChunker(UnitChunker):
+    """
+    PDF strategy: a page that fits is one chunk, longer pages are packed
+    by section (blank-line separated blocks), never across pages.
+    """
+
+    def split_text(self, text: str) -> List[str]:
+        if not text.strip():
+            return []
+        if len(self.encoding.encode_ordinary(text)) <= self.chunk_size:
+            return [text.strip()]
+        return super().split_text(text)
+
+
+class ParagraphChunker(UnitChunker):
+    """
+    DOCX strategy: paragraphs packed up to `chunk_size` tokens.
+    """
+
+
+def speaker_turns(text: str) -> List[str]:
+    turns = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if turns and not SPEAKER_TURN.match(line) and SPEAKER_TURN.match(turns[-1]):
+            turns[-1] += " " + line.strip()
+        else:
+            turns.append(line.strip())
+    return turns
+
+
+class TranscriptChunker(UnitChunker):
+    """
+    Transcript strategy: speaker turns packed up to `chunk_size` tokens.
+    A turn starts at a `Speaker 1: ` label as built by the audio
+    analyzer; unlabelled transcripts fall back to one turn per line.
+    """
+
+    joiner = "\n"
+
+    def units(self, text: str) -> List[str]:
+        return speaker_turns(text)
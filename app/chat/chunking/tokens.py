@@ -0,0 +1,44 @@
+import os
+from functools import lru_cache
+from typing import List
+import numpy as np
+import tiktoken
+
+CHUNK_ENCODING = os.getenv("CHUNK_ENCODING", "cl100k_base")
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str = CHUNK_ENCODING) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(name)
+
+
+@lru_cache(maxsize=None)
+def encoding_for_model(model: str) -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return get_encoding()
+
+
+def count_tokens(texts: List[str], encoding: tiktoken.Encoding) -> np.ndarray:
+    # NOTE: One batched call into tiktoken instead of a Python loop per text:
+    return np.fromiter(
+        (len(tokens) for tokens in encoding.encode_ordinary_batch(texts)),
+        dtype=np.int64,
+        count=len(texts),
+    )
+
+
+def token_windows(text: str, size: int, overlap: int, encoding: tiktoken.Encoding) -> List[str]:
+    """
+    Splits text into windows of `size` tokens overlapping by `overlap`.
+    The text is encoded once; window bounds are computed as arrays and
+    decoded in one batch.
+    """
+    tokens = np.asarray(encoding.encode_ordinary(text), dtype=np.uint32)
+    if len(tokens) <= size:
+        return [text] if len(tokens) else []
+    step = max(1, size - overlap)
+    starts = np.arange(0, len(tokens) - overlap, step)
+    stops = np.minimum(starts + size, len(tokens))
+    return encoding.decode_batch([tokens[start:stop].tolist() for start, stop in zip(starts, stops)])
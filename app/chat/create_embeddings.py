@@ -1,10 +1,13 @@
 from langchain_community.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader, CSVLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from app.chat.vector_stores.pinecone import vector_store
+from app.chat.chunking import build_chunker
+from app.chat.ingest import load_pages, split_pages, ingest_chunks
+from app.chat.loaders import ParallelPyPDFLoader, PDF_EXTRACT_WORKERS
+from app.chat.progress import ProgressTracker
 
-def create_emdeddings(document_id:str, file_path:str, file_extension:str):
-    
-    if file_extension == "pdf":
+def build_loader(file_path:str, file_extension:str):
+    if file_extension == "pdf" and PDF_EXTRACT_WORKERS != 1:
+        loader = ParallelPyPDFLoader(file_path)
+    elif file_extension == "pdf":
         loader = PyPDFLoader(file_path)
     elif file_extension == "txt":
         loader = TextLoader(file_path)
@@ -14,15 +17,14 @@ def create_emdeddings(document_id:str, file_path:str, file_extension:str):
         loader = CSVLoader(file_path)
     else:
         raise ValueError("Invalid file extension")
-    
+    return loader
+
+def create_emdeddings(document_id:str, file_path:str, file_extension:str, tracker:ProgressTracker=None):
+    tracker = tracker or ProgressTracker()
+    loader = build_loader(file_path, file_extension)
+    pages = load_pages(loader, tracker)
     if file_extension == "csv":
-        docs = loader.load()
+        chunks = pages
     else:
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
-        docs = loader.load_and_split(text_splitter)
-    for doc in docs:
-        doc.metadata = {
-            "text": doc.page_content,
-            "doc_id": document_id
-        }
-    vector_store.add_documents(docs)
\ No newline at end of file
+        chunks = split_pages(pages, build_chunker(file_extension), tracker)
+    ingest_chunks(document_id, chunks, tracker)
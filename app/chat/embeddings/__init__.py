@@ -0,0 +1,31 @@
+from app.chat.embeddings.cache import CachedEmbeddings
+from app.chat.embeddings.query_cache import CachedQueryEmbeddings
+
+_embeddings = None
+
+
+def get_embeddings():
+    # NOTE: Built on first use so importing app.chat never needs OpenAI credentials:
+    global _embeddings
+    if _embeddings is None:
+        from app.chat.embeddings.openai import embeddings
+        _embeddings = embeddings
+    return _embeddings
+
+
+def set_embeddings(embeddings) -> None:
+    # NOTE: Swaps in another embeddings client, e.g. the offline stand-ins in benchmarks/:
+    global _embeddings
+    _embeddings = embeddings
+
+
+def cache_stats() -> dict:
+    stats = {}
+    embeddings = get_embeddings()
+    while embeddings is not None:
+        if isinstance(embeddings, CachedQueryEmbeddings):
+            stats["query_embeddings"] = embeddings.stats()
+        elif isinstance(embeddings, CachedEmbeddings):
+            stats["document_embeddings"] = embeddings.stats()
+        embeddings = getattr(embeddings, "underlying", None)
+    return stats
@@ -0,0 +1,194 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, model: str) -> str:
+    digest = hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def pack_vector(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def unpack_vector(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class SQLiteEmbeddingStore:
+    """
+    Embedding vectors in a local SQLite file, stored as float32 blobs.
+    Once `max_entries` is exceeded the least recently used rows are evicted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # NOTE: WAL lets several Celery workers on the host read while one writes:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        if not keys:
+            return {}
+        conn = self._connection()
+        found = {}
+        for i in range(0, len(keys), 500):
+            batch = keys[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            found.update(rows)
+        if found:
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]) -> None:
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, blob, now) for key, blob in items],
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+
+class RedisEmbeddingStore:
+    """
+    Embedding vectors in Redis, with a sorted set of last-use times
+    driving LRU eviction once `max_entries` is exceeded.
+    """
+
+    def __init__(self, url: str, max_entries: int = 100_000, prefix: str = "emb:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.lru_key = f"{prefix}lru"
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        if not keys:
+            return {}
+        blobs = self.client.mget([self.prefix + key for key in keys])
+        found = {key: blob for key, blob in zip(keys, blobs) if blob is not None}
+        if found:
+            now = time.time()
+            self.client.zadd(self.lru_key, {key: now for key in found})
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]) -> None:
+        now = time.time()
+        pipe = self.client.pipeline()
+        for key, blob in items:
+            pipe.set(self.prefix + key, blob)
+            pipe.zadd(self.lru_key, {key: now})
+        pipe.zcard(self.lru_key)
+        count = pipe.execute()[-1]
+        if count > self.max_entries:
+            evicted = self.client.zpopmin(self.lru_key, count - self.max_entries)
+            if evicted:
+                self.client.delete(*[self.prefix + key.decode() for key, _ in evicted])
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Content-addressed cache in front of an embeddings client. Chunks are
+    keyed by sha256(model + normalized text); only misses reach the API.
+    """
+
+    def __init__(self, underlying: Embeddings, store, model: str):
+        self.underlying = underlying
+        self.store = store
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [cache_key(text, self.model) for text in texts]
+        cached = self.store.get_many(list(dict.fromkeys(keys)))
+
+        # NOTE: Identical chunks inside one batch are only sent once:
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        vectors: Dict[str, List[float]] = {key: unpack_vector(blob) for key, blob in cached.items()}
+        if missing:
+            embedded = self.underlying.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), embedded))
+            self.store.put_many((key, pack_vector(vector)) for key, vector in fresh.items())
+            vectors.update(fresh)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying.embed_query(text)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def build_embedding_store() -> Optional[object]:
+    backend = os.getenv("EMBEDDING_CACHE", "sqlite").lower()
+    max_entries = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+    if backend == "sqlite":
+        path = os.getenv("EMBEDDING_CACHE_PATH", "instance/embedding_cache.db")
+        return SQLiteEmbeddingStore(path, max_entries=max_entries)
+    if backend == "redis":
+        return RedisEmbeddingStore(os.getenv("REDIS_URI"), max_entries=max_entries)
+    return None
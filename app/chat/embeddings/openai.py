@@ -1,3 +1,15 @@
-from langchain_openai import OpenAIEmbeddings
+import os
+from app.chat.llms.registry import get_embedding_client
+from app.chat.embeddings.cache import CachedEmbeddings, build_embedding_store
+from app.chat.embeddings.query_cache import build_query_cache
 
-embeddings = OpenAIEmbeddings()
\ No newline at end of file
+openai_embeddings = get_embedding_client(os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002"))
+
+embedding_store = build_embedding_store()
+if embedding_store is not None:
+    embeddings = CachedEmbeddings(openai_embeddings, embedding_store, model=openai_embeddings.model)
+else:
+    embeddings = openai_embeddings
+
+# NOTE: Condensed questions repeat far more than chunks do, they get their own cache:
+embeddings = build_query_cache(embeddings, model=openai_embeddings.model)
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from app.chat.embeddings.cache import cache_key, normalize_text, pack_vector, unpack_vector
+
+
+def normalize_question(text: str) -> str:
+    # NOTE: "What is the notice period?" and "what is the notice period" are the same query:
+    return normalize_text(text).casefold().rstrip("?!. ")
+
+
+class LocalTTLCache:
+    """
+    In-process LRU of query vectors. Entries expire `ttl` seconds after
+    they were stored, the least recently used go first past `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 86400):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, vector = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisTTLCache:
+    """
+    Query vectors shared by every web worker through Redis, expired by
+    Redis itself after `ttl` seconds.
+    """
+
+    def __init__(self, url: str, ttl: float = 86400, prefix: str = "qemb:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[List[float]]:
+        blob = self.client.get(self.prefix + key)
+        return unpack_vector(blob) if blob is not None else None
+
+    def put(self, key: str, vector: List[float]) -> None:
+        self.client.set(self.prefix + key, pack_vector(vector), ex=self.ttl)
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Two-tier cache for query embeddings, keyed by model and normalized
+    question text. The in-process tier answers repeated questions without
+    I/O, the Redis tier shares them across web workers. Redis errors are
+    counted and treated as misses, the cache never fails a chat turn.
+
+    Document embeddings pass straight through to `underlying`.
+    """
+
+    def __init__(self, underlying: Embeddings, model: str, local: Optional[LocalTTLCache] = None,
+                 shared: Optional[RedisTTLCache] = None):
+        self.underlying = underlying
+        self.model = model
+        self.local = local
+        self.shared = shared
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.miss_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = cache_key(normalize_question(text), self.model)
+        if self.local is not None:
+            vector = self.local.get(key)
+            if vector is not None:
+                self._count("local_hits")
+                return vector
+
+        if self.shared is not None:
+            try:
+                vector = self.shared.get(key)
+            except Exception:
+                self._count("errors")
+                vector = None
+            if vector is not None:
+                self._count("shared_hits")
+                if self.local is not None:
+                    self.local.put(key, vector)
+                return vector
+
+        start = time.perf_counter()
+        vector = self.underlying.embed_query(text)
+        with self._lock:
+            self.misses += 1
+            self.miss_seconds += time.perf_counter() - start
+
+        if self.local is not None:
+            self.local.put(key, vector)
+        if self.shared is not None:
+            try:
+                self.shared.put(key, vector)
+            except Exception:
+                self._count("errors")
+        return vector
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            hits = self.local_hits + self.shared_hits
+            total = hits + self.misses
+            return {
+                "local_hits": self.local_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": hits / total if total else 0.0,
+                "mean_miss_seconds": self.miss_seconds / self.misses if self.misses else 0.0,
+                "local_entries": len(self.local) if self.local is not None else 0,
+            }
+
+
+def build_query_cache(underlying: Embeddings, model: str) -> Embeddings:
+    max_entries = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+    ttl = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "86400"))
+    redis_url = os.getenv("REDIS_URI")
+    use_redis = os.getenv("QUERY_EMBEDDING_CACHE_REDIS", "true").lower() == "true"
+
+    local = LocalTTLCache(max_entries, ttl) if max_entries > 0 else None
+    shared = RedisTTLCache(redis_url, ttl) if redis_url and use_redis else None
+    if local is None and shared is None:
+        return underlying
+    return CachedQueryEmbeddings(underlying, model, local=local, shared=shared)
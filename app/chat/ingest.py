@@ -0,0 +1,132 @@
+import hashlib
+import os
+from collections import Counter
+from itertools import islice
+from typing import Iterable, Iterator, List
+from langchain_core.documents import Document
+from app.chat.vector_stores import build_upsert_engine, delete_vectors, document_namespace
+from app.chat.progress import ProgressTracker
+from app.chat.retrievers.bm25 import BM25Index, save_index
+from app.web.api import (
+    add_chunks,
+    get_chunk_positions,
+    get_document_chunks,
+    update_chunk_positions,
+    delete_chunks,
+)
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "100"))
+
+
+def load_pages(loader, tracker: ProgressTracker) -> Iterator[Document]:
+    pages = loader.lazy_load()
+    while True:
+        with tracker.stage("parse"):
+            page = next(pages, None)
+        if page is None:
+            return
+        tracker.incr(pages=1)
+        yield page
+
+
+def split_pages(pages: Iterable[Document], text_splitter, tracker: ProgressTracker) -> Iterator[Document]:
+    for page in pages:
+        with tracker.stage("chunk"):
+            chunks = text_splitter.split_documents([page])
+        tracker.incr(tokens=sum(chunk.metadata.get("tokens", 0) for chunk in chunks))
+        yield from chunks
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def chunk_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def make_chunk_id(document_id: str, digest: str, occurrence: int) -> str:
+    # NOTE: Content, not position: inserting a paragraph only adds IDs, the
+    # chunks after it keep theirs. The occurrence tells repeated text apart:
+    return f"{document_id}#{digest}#{occurrence}"
+
+
+def number_chunks(document_id: str, chunks: Iterable[Document]) -> Iterator[tuple]:
+    occurrences = Counter()
+    for position, doc in enumerate(chunks):
+        digest = chunk_digest(doc.page_content)
+        row = {
+            "id": make_chunk_id(document_id, digest, occurrences[digest]),
+            "document_id": document_id,
+            "position": position,
+            "page": doc.metadata.get("page"),
+            "tokens": doc.metadata.get("tokens"),
+            "text": doc.page_content,
+        }
+        occurrences[digest] += 1
+        yield row, doc
+
+
+def ingest_chunks(document_id: str, chunks: Iterable[Document], tracker: ProgressTracker, batch_size: int = EMBED_BATCH_SIZE) -> None:
+    def on_result(result):
+        tracker.record("embed", result.embed_seconds)
+        tracker.record("upsert", result.upsert_seconds)
+        tracker.incr(vectors=result.size)
+
+    # NOTE: What is already indexed for this document, by chunk ID. Unchanged
+    # chunks are skipped, new ones upserted and missing ones deleted:
+    indexed = get_chunk_positions(document_id)
+    namespace = document_namespace(document_id)
+    seen = set()
+    added = []
+
+    # NOTE: Only a bounded number of batches are alive at a time, and each
+    # batch is searchable as soon as it is upserted:
+    try:
+        with build_upsert_engine(on_result=on_result, namespace=namespace) as engine:
+            for batch in batched(number_chunks(document_id, chunks), batch_size):
+                new = [(row, doc) for row, doc in batch if row["id"] not in indexed and row["id"] not in seen]
+                moved = [
+                    {"id": row["id"], "position": row["position"], "page": row["page"]}
+                    for row, _ in batch
+                    if row["id"] in indexed and indexed[row["id"]] != row["position"]
+                ]
+                seen.update(row["id"] for row, _ in batch)
+                update_chunk_positions(moved)
+                tracker.incr(chunks=len(batch), skipped=len(batch) - len(new))
+                if not new:
+                    continue
+
+                # NOTE: Chunk text goes to the local chunk store before its vector
+                # exists, vector metadata only carries the IDs:
+                add_chunks([row for row, _ in new])
+                added.extend(row["id"] for row, _ in new)
+                for row, doc in new:
+                    doc.metadata = {
+                        "doc_id": document_id,
+                        "chunk_id": row["id"],
+                    }
+                # NOTE: The engine records the embed and upsert timings itself, this
+                # only reports where the document is while batches go in:
+                tracker.set_stage("embed")
+                engine.submit([doc for _, doc in new], [row["id"] for row, _ in new])
+            tracker.set_stage("upsert")
+    except Exception:
+        # NOTE: Forget chunks whose vectors may be missing, so the next run re-embeds them:
+        delete_chunks(added)
+        raise
+
+    removed = [chunk_id for chunk_id in indexed if chunk_id not in seen]
+    if removed:
+        delete_vectors(removed, namespace=namespace)
+        delete_chunks(removed)
+        tracker.incr(deleted=len(removed))
+
+    # NOTE: The lexical index covers every chunk of the document, so it is
+    # rebuilt from the chunk store rather than from this run's new chunks:
+    with tracker.stage("index"):
+        save_index(document_id, BM25Index.build(get_document_chunks(document_id)))
+    for name, seconds in engine.summary().items():
+        tracker.timings[name] = seconds
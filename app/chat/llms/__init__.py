@@ -0,0 +1,14 @@
+import os
+from functools import partial
+from .chatopenai import build_llm
+from .registry import get_llm, get_embedding_client
+
+DEFAULT_LLM = os.getenv("DEFAULT_LLM_MODEL", "gpt-4o")
+# NOTE: ChatOpenAI's default model, used to condense follow-up questions:
+CONDENSE_LLM = os.getenv("CONDENSE_LLM_MODEL", "gpt-3.5-turbo")
+
+llm_map = {
+    "gpt-4o": partial(build_llm, model_name="gpt-4o"),
+    "gpt-4o-mini": partial(build_llm, model_name="gpt-4o-mini"),
+    "gpt-3.5-turbo": partial(build_llm, model_name="gpt-3.5-turbo"),
+}
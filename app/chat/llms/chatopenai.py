@@ -1,9 +1,9 @@
-from langchain_openai import ChatOpenAI
 from langchain_community.llms import Ollama, Bedrock
+from app.chat.llms.registry import get_llm
 
 
-def build_llm(chat_args):
-       return ChatOpenAI(model="gpt-4o", streaming=True, temperature=0.6)
+def build_llm(chat_args, model_name="gpt-4o"):
+       return get_llm(model_name, streaming=True, temperature=0.6)
       #  return Ollama(model="llama3:8b", temperature=0.6)
     # return Bedrock(
     #     model_id="meta.llama3-8b-instruct-v1:0",
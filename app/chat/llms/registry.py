@@ -0,0 +1,191 @@
+import os
+import threading
+from typing import Any, Dict, Tuple
+import httpx
+
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "32"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+# NOTE: In-flight requests per model, with overrides such as "gpt-4o=8,gpt-3.5-turbo=32":
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "16"))
+LLM_CONCURRENCY_OVERRIDES = dict(
+    item.strip().split("=", 1) for item in os.getenv("LLM_CONCURRENCY_OVERRIDES", "").split(",") if "=" in item
+)
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        try:
+            yield from self._stream
+        finally:
+            # NOTE: Also runs when an abandoned iterator is garbage collected:
+            self._release()
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+    def __del__(self):
+        # NOTE: A response dropped without being read or closed gives its slot back too:
+        self._release()
+
+
+class ModelConcurrencyTransport(httpx.BaseTransport):
+    """
+    Caps the requests one model has in flight over a shared transport. A
+    slot is held until the response body is closed, so a streamed
+    completion counts for its whole duration.
+
+    That includes time spent waiting on the reader: a streamed answer
+    blocks on its bounded token queue while the client is slow, still
+    holding its slot, until STREAM_STALL_SECONDS aborts it. The slot is
+    also released once the body is read to the end or the response is
+    garbage collected unclosed. Requests wait at most
+    LLM_QUEUE_TIMEOUT_SECONDS for a slot and then fail with PoolTimeout.
+    Keep STREAM_WORKERS at or below the smallest limit of a model that
+    answers streamed chats, so streams queue for a worker instead.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, limit: int, model: str):
+        self._transport = transport
+        self._slots = threading.BoundedSemaphore(limit)
+        self.model = model
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self._slots.acquire(timeout=LLM_QUEUE_TIMEOUT_SECONDS):
+            raise httpx.PoolTimeout(f"No free request slot for {self.model}", request=request)
+        released = threading.Event()
+
+        def release():
+            if not released.is_set():
+                released.set()
+                self._slots.release()
+
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        # NOTE: The shared transport outlives every client built on it:
+        pass
+
+
+class ClientRegistry:
+    """
+    Long-lived LLM and embedding clients keyed by (provider, model,
+    params), all sending their requests through one bounded pool of
+    keep-alive connections.
+    """
+
+    def __init__(self):
+        self._transport = httpx.HTTPTransport(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_KEEPALIVE),
+        )
+        self._model_transports: Dict[str, ModelConcurrencyTransport] = {}
+        self._clients: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def http_client(self, model: str) -> httpx.Client:
+        with self._lock:
+            transport = self._model_transports.get(model)
+            if transport is None:
+                limit = int(LLM_CONCURRENCY_OVERRIDES.get(model, LLM_CONCURRENCY))
+                transport = self._model_transports[model] = ModelConcurrencyTransport(self._transport, limit, model)
+        return httpx.Client(transport=transport, timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0))
+
+    def _get(self, kind: str, provider: str, model: str, params: Dict[str, Any]):
+        key = (kind, provider, model, tuple(sorted(params.items())))
+        with self._lock:
+            client = self._clients.get(key)
+        if client is None:
+            client = builders[(kind, provider)](self, model, **params)
+            with self._lock:
+                client = self._clients.setdefault(key, client)
+        return client
+
+    def llm(self, provider: str, model: str, **params):
+        return self._get("llm", provider, model, params)
+
+    def embeddings(self, provider: str, model: str, **params):
+        return self._get("embeddings", provider, model, params)
+
+
+def _openai_llm(registry: ClientRegistry, model: str, **params):
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=model, http_client=registry.http_client(model), **params)
+
+
+def _openai_embeddings(registry: ClientRegistry, model: str, **params):
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(model=model, http_client=registry.http_client(model), **params)
+
+
+def _ollama_llm(registry: ClientRegistry, model: str, **params):
+    # NOTE: Ollama talks to a local server with its own client, only the instance is shared:
+    from langchain_community.llms import Ollama
+
+    return Ollama(model=model, **params)
+
+
+builders = {
+    ("llm", "openai"): _openai_llm,
+    ("llm", "ollama"): _ollama_llm,
+    ("embeddings", "openai"): _openai_embeddings,
+}
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # NOTE: Pooled connections must not be shared with forked Celery workers:
+    global _registry, _registry_lock
+    _registry_lock = threading.Lock()
+    _registry = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_registry() -> ClientRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+    return _registry
+
+
+def parse_spec(spec: str) -> Tuple[str, str]:
+    # NOTE: "openai:gpt-4o" or "ollama:llama3:8b", a bare model name means OpenAI:
+    provider, _, model = spec.partition(":")
+    if model and provider in {provider for _, provider in builders}:
+        return provider, model
+    return "openai", spec
+
+
+def get_llm(spec: str, **params):
+    provider, model = parse_spec(spec)
+    return get_registry().llm(provider, model, **params)
+
+
+def get_embedding_client(spec: str, **params):
+    provider, model = parse_spec(spec)
+    return get_registry().embeddings(provider, model, **params)
@@ -0,0 +1 @@
+from .pdf import ParallelPyPDFLoader, PDF_EXTRACT_WORKERS
@@ -0,0 +1,77 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List
+from pypdf import PdfReader
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+# NOTE: 1 keeps serial extraction, 0 uses one worker per CPU:
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+PDF_PAGES_PER_RANGE = int(os.getenv("PDF_PAGES_PER_RANGE", "25"))
+
+logger = logging.getLogger(__name__)
+
+
+def _extract_range(file_path: str, start: int, stop: int) -> List[str]:
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+class ParallelPyPDFLoader(BaseLoader):
+    """
+    Extracts PDF text in page ranges across a process pool and yields the
+    pages back in order, with the same `source`/`page` metadata as
+    PyPDFLoader. At most two ranges per worker are in flight, so memory
+    stays bounded for very long documents.
+    """
+
+    def __init__(self, file_path: str, workers: int = PDF_EXTRACT_WORKERS, pages_per_range: int = PDF_PAGES_PER_RANGE):
+        self.file_path = file_path
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_range = max(1, pages_per_range)
+
+    def lazy_load(self) -> Iterator[Document]:
+        page_count = len(PdfReader(self.file_path).pages)
+        ranges = [
+            (start, min(start + self.pages_per_range, page_count))
+            for start in range(0, page_count, self.pages_per_range)
+        ]
+        if self.workers <= 1 or len(ranges) <= 1:
+            for start, stop in ranges:
+                yield from self._documents(start, _extract_range(self.file_path, start, stop))
+            return
+
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            pending = deque()
+            remaining = iter(ranges)
+            try:
+                for start, stop in remaining:
+                    pending.append((start, pool.submit(_extract_range, self.file_path, start, stop)))
+                    if len(pending) >= self.workers * 2:
+                        break
+            except (AssertionError, OSError) as e:
+                # NOTE: Prefork Celery children are daemonic and can't start their
+                # own pool, which shows on the first submit:
+                pool.shutdown(wait=False, cancel_futures=True)
+                logger.warning("Falling back to serial PDF extraction: %s", e)
+                yield from ParallelPyPDFLoader(self.file_path, workers=1, pages_per_range=self.pages_per_range).lazy_load()
+                return
+            while pending:
+                start, future = pending.popleft()
+                next_range = next(remaining, None)
+                if next_range is not None:
+                    pending.append((next_range[0], pool.submit(_extract_range, self.file_path, *next_range)))
+                yield from self._documents(start, future.result())
+        finally:
+            # NOTE: Every exit, including a failed range or a consumer that stops early:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _documents(self, start: int, texts: List[str]) -> Iterator[Document]:
+        for offset, text in enumerate(texts):
+            yield Document(
+                page_content=text,
+                metadata={"source": self.file_path, "page": start + offset},
+            )
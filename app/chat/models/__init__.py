@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, Extra
 
 class Metadata(BaseModel, extra=Extra.allow):
@@ -10,3 +11,13 @@ class ChatArgs(BaseModel, extra=Extra.allow):
     document_id: list[str]
     metadata: Metadata
     streaming: bool
+    template: Optional[str] = None
+    # NOTE: Retrieval over-fetches fetch_k chunks and MMR orders them, keeping k
+    # when context packing is off, otherwise all of them for the packer:
+    k: int = 4
+    fetch_k: int = 20
+    mmr_lambda: float = 0.7
+    rerank: bool = False
+    # NOTE: Tokens of retrieved context packed into the prompt, CONTEXT_TOKEN_BUDGET
+    # if unset, 0 turns packing off:
+    context_tokens: Optional[int] = None
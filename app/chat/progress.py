@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class ProgressTracker:
+    """
+    Collects stage timings and counters while a document is ingested.
+    The base tracker only keeps them in memory; subclasses override
+    `on_stage` and `on_update` to publish them somewhere.
+    """
+
+    def __init__(self):
+        self.stage_name = None
+        self.counts = {"pages": 0, "chunks": 0, "vectors": 0, "tokens": 0, "skipped": 0, "deleted": 0}
+        self.timings = {}
+
+    def set_stage(self, name: str) -> None:
+        self.stage_name = name
+        self.on_stage(name)
+
+    @contextmanager
+    def stage(self, name: str):
+        self.set_stage(name)
+        start = perf_counter()
+        try:
+            yield self
+        finally:
+            self.record(name, perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        self.on_update()
+
+    def incr(self, **counts: int) -> None:
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+        self.on_update()
+
+    def on_stage(self, name: str) -> None:
+        pass
+
+    def on_update(self, force: bool = False) -> None:
+        pass
@@ -0,0 +1,4 @@
+from .vector import Match, VectorIndexRetriever, hydrate
+from .hybrid import HybridRetriever, reciprocal_rank_fusion
+from .mmr import MMRRetriever, mmr_select
+from .packing import ContextPackingRetriever
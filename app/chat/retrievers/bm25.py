@@ -0,0 +1,115 @@
+import json
+import math
+import os
+import re
+import zlib
+from collections import Counter, defaultdict
+from functools import lru_cache
+from heapq import nlargest
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "instance/lexical")
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# NOTE: Keeps identifiers such as 4.2.1, ERR-404 or SKU_123 in one piece:
+TOKEN = re.compile(r"[0-9a-z]+(?:[._/-][0-9a-z]+)*")
+PART = re.compile(r"[0-9a-z]+")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN.findall(text.lower()):
+        tokens.append(token)
+        parts = PART.findall(token)
+        # NOTE: "err-404" also matches a query for "404":
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the chunks of one document. Postings are stored as
+    delta-encoded chunk numbers with their term frequencies, serialized
+    as zlib-compressed JSON.
+    """
+
+    def __init__(self, ids: List[str], lengths: List[int], postings: Dict[str, Tuple[List[int], List[int]]]):
+        self.ids = ids
+        self.lengths = lengths
+        self.postings = postings
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    @classmethod
+    def build(cls, chunks: Iterable[Tuple[str, str]]) -> "BM25Index":
+        ids, lengths = [], []
+        postings = defaultdict(lambda: ([], []))
+        for number, (chunk_id, text) in enumerate(chunks):
+            tokens = tokenize(text)
+            ids.append(chunk_id)
+            lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                postings[term][0].append(number)
+                postings[term][1].append(frequency)
+        return cls(ids, lengths, dict(postings))
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        count = len(self.ids)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            numbers, frequencies = self.postings[term]
+            idf = math.log(1 + (count - len(numbers) + 0.5) / (len(numbers) + 0.5))
+            for number, frequency in zip(numbers, frequencies):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[number] / (self.average_length or 1))
+                scores[number] += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return [(self.ids[number], score) for number, score in nlargest(k, scores.items(), key=lambda item: item[1])]
+
+    def dumps(self) -> bytes:
+        postings = {}
+        for term, (numbers, frequencies) in self.postings.items():
+            deltas = [numbers[0]] + [b - a for a, b in zip(numbers, numbers[1:])]
+            postings[term] = [deltas, frequencies]
+        payload = {"ids": self.ids, "lengths": self.lengths, "postings": postings}
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 6)
+
+    @classmethod
+    def loads(cls, blob: bytes) -> "BM25Index":
+        payload = json.loads(zlib.decompress(blob))
+        postings = {}
+        for term, (deltas, frequencies) in payload["postings"].items():
+            numbers, total = [], 0
+            for delta in deltas:
+                total += delta
+                numbers.append(total)
+            postings[term] = (numbers, frequencies)
+        return cls(payload["ids"], payload["lengths"], postings)
+
+
+def index_path(document_id: str) -> Path:
+    return Path(LEXICAL_INDEX_PATH) / f"{document_id}.bm25"
+
+
+def save_index(document_id: str, index: BM25Index) -> None:
+    path = index_path(document_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(index.dumps())
+    os.replace(tmp, path)
+
+
+@lru_cache(maxsize=64)
+def _load(path: str, mtime_ns: int) -> BM25Index:
+    return BM25Index.loads(Path(path).read_bytes())
+
+
+def load_index(document_id: str) -> Optional[BM25Index]:
+    # NOTE: Keyed by mtime too, so a re-ingested document is read again:
+    path = index_path(document_id)
+    try:
+        return _load(str(path), path.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return None
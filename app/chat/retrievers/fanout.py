@@ -0,0 +1,68 @@
+import heapq
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Iterable, List, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", "16"))
+FANOUT_TIMEOUT_SECONDS = float(os.getenv("FANOUT_TIMEOUT_SECONDS", "2.0"))
+# NOTE: 0 splits top_k evenly between the documents:
+FANOUT_DOCUMENT_QUOTA = int(os.getenv("FANOUT_DOCUMENT_QUOTA", "0"))
+
+# NOTE: Shared by every chat, so a burst of wide queries cannot open unbounded connections:
+_pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="retrieval-fanout")
+
+
+def fan_out(fn: Callable[[T], R], items: Sequence[T], timeout: float = FANOUT_TIMEOUT_SECONDS) -> List[R]:
+    """
+    Calls `fn` for every item on the shared pool and returns the results
+    that arrived within `timeout`. Slow or failing items are logged and
+    left out, unless none of them succeeded: then the first error, or a
+    TimeoutError, is raised.
+
+    Timing out only cancels calls still queued, calls already running
+    finish in the background and their results are dropped. A single item
+    is called on this thread without the timeout, with nothing to fall
+    back to it is bounded by the client's own timeout instead.
+    """
+    if len(items) == 1:
+        return [fn(items[0])]
+
+    futures = [_pool.submit(fn, item) for item in items]
+    done, not_done = wait(futures, timeout=timeout)
+    for future in not_done:
+        future.cancel()
+    if not_done:
+        logger.warning("Retrieval fan-out: %d of %d queries timed out after %.1fs", len(not_done), len(items), timeout)
+
+    results, errors = [], []
+    for future in futures:
+        if future not in done:
+            continue
+        if future.exception() is not None:
+            errors.append(future.exception())
+            continue
+        results.append(future.result())
+    if not results and not errors and not_done:
+        raise TimeoutError(f"Retrieval fan-out: all {len(items)} queries timed out after {timeout:.1f}s")
+    if errors:
+        if not results:
+            raise errors[0]
+        logger.warning("Retrieval fan-out: %d of %d queries failed: %s", len(errors), len(items), errors[0])
+    return results
+
+
+def document_quota(top_k: int, documents: int, quota: int = FANOUT_DOCUMENT_QUOTA) -> int:
+    return quota or max(1, math.ceil(top_k / max(documents, 1)))
+
+
+def merge_by_score(rankings: Iterable[List[T]], top_k: int, key: Callable[[T], float]) -> List[T]:
+    # NOTE: Every ranking is already sorted best first, so a heap merge is enough:
+    return list(islice(heapq.merge(*rankings, key=lambda item: -key(item)), top_k))
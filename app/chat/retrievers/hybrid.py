@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from app.chat.retrievers.bm25 import BM25Index, load_index, save_index
+from app.chat.retrievers.vector import Match, VectorIndexRetriever, hydrate
+from app.web.api import get_document_chunks
+
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))
+RRF_K = 60
+
+# NOTE: Vector searches are network bound, a few threads serve every chat:
+_searches = ThreadPoolExecutor(max_workers=int(os.getenv("HYBRID_SEARCH_WORKERS", "8")), thread_name_prefix="vector-search")
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = RRF_K) -> Dict[str, float]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, id in enumerate(ranking):
+            scores[id] = scores.get(id, 0.0) + 1.0 / (rrf_k + rank + 1)
+    return scores
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Runs the vector search and a BM25 search over the selected documents'
+    lexical indexes at the same time, and fuses the two rankings with
+    reciprocal-rank fusion. Exact identifiers such as clause numbers or
+    error codes are found by BM25 even when their embedding is not close.
+    """
+
+    vector: VectorIndexRetriever
+    k: int = 4
+    fetch_k: int = HYBRID_FETCH_K
+    rrf_k: int = RRF_K
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _lexical_index(self, document_id: str) -> BM25Index:
+        index = load_index(document_id)
+        if index is None:
+            # NOTE: Documents ingested before lexical indexes existed:
+            index = BM25Index.build(get_document_chunks(document_id))
+            save_index(document_id, index)
+        return index
+
+    def lexical_search(self, query: str, top_k: int) -> List[Match]:
+        matches = []
+        for document_id in self.vector.document_ids:
+            for chunk_id, score in self._lexical_index(document_id).search(query, top_k):
+                matches.append(Match(
+                    id=chunk_id,
+                    score=score,
+                    metadata={"doc_id": document_id, "chunk_id": chunk_id},
+                    namespace=self.vector.namespace_of(document_id),
+                ))
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches[:top_k]
+
+    def candidates(self, query: str, top_k: int, include_values: bool = False) -> List[Match]:
+        fetch_k = max(self.fetch_k, top_k)
+        dense = _searches.submit(self.vector.candidates, query, fetch_k, include_values)
+        # NOTE: The lexical side runs on this thread, it may read the chunk store:
+        lexical = self.lexical_search(query, fetch_k)
+        dense = dense.result()
+
+        by_chunk = {match.chunk_id: match for match in lexical}
+        by_chunk.update({match.chunk_id: match for match in dense})
+        scores = reciprocal_rank_fusion(
+            [[match.chunk_id for match in dense], [match.chunk_id for match in lexical]], self.rrf_k
+        )
+        ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        return [
+            Match(id=by_chunk[chunk_id].id, score=scores[chunk_id], metadata=by_chunk[chunk_id].metadata,
+                  values=by_chunk[chunk_id].values, namespace=by_chunk[chunk_id].namespace)
+            for chunk_id in ranked
+        ]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return hydrate(self.candidates(query, self.k))
@@ -0,0 +1,100 @@
+from typing import Any, List, Optional
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from app.chat.retrievers.bm25 import tokenize
+from app.chat.retrievers.vector import hydrate
+
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def mmr_select(relevance: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """
+    Maximal marginal relevance: repeatedly picks the candidate with the
+    best trade-off between relevance and its highest similarity to what
+    is already picked. `vectors` must be unit rows.
+    """
+    redundancy = np.zeros(len(relevance), dtype=np.float32)
+    available = np.ones(len(relevance), dtype=bool)
+    selected = []
+    for _ in range(min(k, len(relevance))):
+        scores = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+    return selected
+
+
+def normalize_scores(scores: np.ndarray) -> np.ndarray:
+    # NOTE: Min-max to [0, 1], fused rank scores and cosine scores alike:
+    low, high = float(scores.min()), float(scores.max())
+    if high - low <= 1e-12:
+        return np.ones(len(scores), dtype=np.float32)
+    return ((scores - low) / (high - low)).astype(np.float32)
+
+
+def lexical_overlap(query: str, texts: List[str]) -> np.ndarray:
+    # NOTE: Share of the query's distinct terms that appear in each text:
+    terms = set(tokenize(query))
+    if not terms:
+        return np.zeros(len(texts), dtype=np.float32)
+    return np.array([len(terms.intersection(tokenize(text))) / len(terms) for text in texts], dtype=np.float32)
+
+
+class MMRRetriever(BaseRetriever):
+    """
+    Over-fetches `fetch_k` candidates from `base` with their vectors and
+    keeps the `k` most relevant, least redundant ones, so overlapping
+    chunks do not crowd the prompt. Relevance is the score `base` ranked
+    the candidates by, e.g. the fused hybrid score, the vectors only
+    measure redundancy. With `rerank`, relevance also counts how many of
+    the query's terms each chunk contains.
+
+    With `k` unset every candidate is kept, in MMR order, for a packer
+    that cuts the list at its token budget.
+    """
+
+    base: Any
+    k: Optional[int] = 4
+    fetch_k: int = 20
+    lambda_mult: float = 0.7
+    rerank: bool = False
+    rerank_weight: float = 0.3
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _vector_retriever(self):
+        return getattr(self.base, "vector", self.base)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        keep = self.fetch_k if self.k is None else self.k
+        fetch_k = max(self.fetch_k, keep)
+        # NOTE: With lambda 1, or nothing to drop, MMR is plain relevance order
+        # and the vectors are not worth fetching:
+        diversify = self.lambda_mult < 1 and (self.k is None or fetch_k > self.k)
+
+        matches = self.base.candidates(query, fetch_k, include_values=diversify)
+        if diversify:
+            self._vector_retriever().fill_values(matches)
+            matches = [match for match in matches if match.values]
+        docs = hydrate(matches)
+        if not docs:
+            return docs
+
+        # NOTE: Not cosine to the query, which would sink chunks only BM25 found:
+        relevance = normalize_scores(np.asarray([doc.metadata["score"] for doc in docs], dtype=np.float32))
+        if self.rerank:
+            relevance = relevance + self.rerank_weight * lexical_overlap(query, [doc.page_content for doc in docs])
+        if not diversify:
+            return [docs[i] for i in np.argsort(-relevance, kind="stable")[:keep].tolist()]
+
+        # NOTE: hydrate drops matches without text, keep vectors aligned with docs:
+        by_chunk = {match.chunk_id: match for match in matches}
+        vectors = _unit(np.asarray([by_chunk[doc.metadata["chunk_id"]].values for doc in docs], dtype=np.float32))
+        return [docs[i] for i in mmr_select(relevance, vectors, keep, self.lambda_mult)]
@@ -0,0 +1,142 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from app.chat.chunking.tokens import count_tokens, encoding_for_model
+from app.chat.embeddings.cache import normalize_text
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_MODEL = os.getenv("DEFAULT_LLM_MODEL", "gpt-4o")
+
+
+@dataclass
+class Span:
+    doc_id: Optional[str]
+    text: str
+    score: float
+    first: Optional[int]
+    last: Optional[int]
+    page: Optional[int]
+    # NOTE: Best position of its chunks in the retriever's order:
+    rank: int = 0
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+def overlap_length(left: str, right: str, min_chars: int = 16, max_chars: int = 4000) -> int:
+    """
+    Length of the longest suffix of `left` that is also a prefix of
+    `right`, i.e. the text two neighbouring chunk windows share. Shorter
+    matches than `min_chars` are treated as coincidence.
+    """
+    tail = left[-max_chars:]
+    probe = right[:min_chars]
+    if len(probe) < min_chars:
+        return 0
+    start = tail.find(probe)
+    while start != -1:
+        if right.startswith(tail[start:]):
+            return len(tail) - start
+        start = tail.find(probe, start + 1)
+    return 0
+
+
+def merge_spans(docs: List[Document]) -> List[Span]:
+    # NOTE: Chunks of the same document with consecutive positions become one
+    # span, their shared window overlap kept once. Spans come back in the
+    # retriever's order (e.g. MMR's), by their best ranked chunk:
+    ordered = sorted(
+        enumerate(docs),
+        key=lambda item: (str(item[1].metadata.get("doc_id")), item[1].metadata.get("position") is None, item[1].metadata.get("position") or 0),
+    )
+    spans: List[Span] = []
+    for rank, doc in ordered:
+        metadata = doc.metadata
+        position = metadata.get("position")
+        previous = spans[-1] if spans else None
+        if (
+            previous is not None
+            and position is not None
+            and previous.last is not None
+            and previous.doc_id == metadata.get("doc_id")
+            and position - previous.last <= 1
+        ):
+            if position == previous.last:
+                previous.rank = min(previous.rank, rank)
+                continue
+            shared = overlap_length(previous.text, doc.page_content)
+            separator = "" if shared else "\n"
+            previous.text += separator + doc.page_content[shared:]
+            previous.last = position
+            previous.score = max(previous.score, metadata.get("score") or 0.0)
+            previous.rank = min(previous.rank, rank)
+            previous.chunk_ids.append(metadata.get("chunk_id"))
+            continue
+        spans.append(Span(
+            doc_id=metadata.get("doc_id"),
+            text=doc.page_content,
+            score=metadata.get("score") or 0.0,
+            first=position,
+            last=position,
+            page=metadata.get("page"),
+            rank=rank,
+            chunk_ids=[metadata.get("chunk_id")],
+        ))
+    spans.sort(key=lambda span: (span.rank, -span.score))
+    return spans
+
+
+def dedupe_spans(spans: List[Span]) -> List[Span]:
+    # NOTE: In the given order, so of two copies of the same text the better ranked one stays:
+    kept: List[Span] = []
+    normalized: List[str] = []
+    for span in spans:
+        text = normalize_text(span.text)
+        if any(text in other for other in normalized):
+            continue
+        kept.append(span)
+        normalized.append(text)
+    return kept
+
+
+class ContextPackingRetriever(BaseRetriever):
+    """
+    Turns the chunks from `base` into the context the LLM sees: adjacent
+    and overlapping chunks of a document are merged into contiguous spans,
+    repeated text is dropped, and spans are packed in the order `base`
+    returned them, e.g. MMR's diversity order, until `budget` tokens of
+    the model's encoding are used.
+    """
+
+    base: Any
+    budget: int = CONTEXT_TOKEN_BUDGET
+    model: str = CONTEXT_MODEL
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        docs = self.base.invoke(query, config={"callbacks": run_manager.get_child()})
+        spans = dedupe_spans(merge_spans(docs))
+        if not spans:
+            return []
+
+        tokens = count_tokens([span.text for span in spans], encoding_for_model(self.model))
+        packed, used = [], 0
+        for span, size in zip(spans, tokens.tolist()):
+            # NOTE: The first span always goes in, even over budget:
+            if packed and used + size > self.budget:
+                continue
+            used += size
+            packed.append(Document(
+                page_content=span.text,
+                metadata={
+                    "doc_id": span.doc_id,
+                    "chunk_ids": span.chunk_ids,
+                    "score": span.score,
+                    "page": span.page,
+                    "tokens": size,
+                },
+            ))
+        return packed
@@ -0,0 +1,126 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from app.chat.retrievers.fanout import document_quota, fan_out, merge_by_score
+from app.web.api import get_chunks
+
+
+@dataclass
+class Match:
+    id: str
+    score: float
+    metadata: Dict[str, Any]
+    values: Optional[List[float]] = None
+    namespace: Optional[str] = None
+
+    @property
+    def chunk_id(self) -> str:
+        return self.metadata.get("chunk_id", self.id)
+
+    @property
+    def doc_id(self) -> Optional[str]:
+        return self.metadata.get("doc_id")
+
+
+def hydrate(matches: List[Match]) -> List[Document]:
+    # NOTE: One bulk lookup in the chunk store for every match. Vectors
+    # ingested before the chunk store still carry their text in metadata:
+    chunks = get_chunks([match.chunk_id for match in matches])
+    docs = []
+    for match in matches:
+        chunk = chunks.get(match.chunk_id, {})
+        text = chunk.get("text") or match.metadata.get("text")
+        if text is None:
+            continue
+        docs.append(Document(
+            page_content=text,
+            metadata={
+                "doc_id": match.doc_id,
+                "chunk_id": match.chunk_id,
+                "score": match.score,
+                "position": chunk.get("position"),
+                "page": chunk.get("page"),
+            },
+        ))
+    return docs
+
+
+class VectorIndexRetriever(BaseRetriever):
+    """
+    Queries the vector index directly for the selected documents and
+    hydrates chunk text from the local chunk store.
+
+    With several documents selected, every document gets its own top-k
+    query, in its own namespace when `partitions` maps namespaces to
+    documents. The queries run concurrently with a per-query timeout, and
+    each document contributes at most its quota of matches, so a few
+    large documents cannot crowd out the rest.
+    """
+
+    index: Any
+    embeddings: Any
+    document_ids: List[str]
+    k: int = 4
+    namespace: Optional[str] = None
+    partitions: Optional[Dict[Optional[str], List[str]]] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def namespace_of(self, document_id: str) -> Optional[str]:
+        for namespace, document_ids in (self.partitions or {}).items():
+            if document_id in document_ids:
+                return namespace
+        return self.namespace
+
+    def _query(self, namespace: Optional[str], document_ids: List[str], vector: List[float],
+               top_k: int, include_values: bool) -> List[Match]:
+        response = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            filter={"doc_id": {"$in": document_ids}},
+            namespace=namespace,
+            include_metadata=True,
+            include_values=include_values,
+        )
+        return [
+            Match(
+                id=match.id,
+                score=match.score,
+                metadata=dict(match.metadata or {}),
+                values=list(match.values) if include_values and match.values else None,
+                namespace=namespace,
+            )
+            for match in response.matches
+        ]
+
+    def search(self, vector: List[float], top_k: int, include_values: bool = False) -> List[Match]:
+        if len(self.document_ids) == 1:
+            return self._query(self.namespace_of(self.document_ids[0]), self.document_ids, vector, top_k, include_values)
+        quota = document_quota(top_k, len(self.document_ids))
+        rankings = fan_out(
+            lambda document_id: self._query(self.namespace_of(document_id), [document_id], vector, quota, include_values),
+            self.document_ids,
+        )
+        return merge_by_score(rankings, top_k, key=lambda match: match.score)
+
+    def candidates(self, query: str, top_k: int, include_values: bool = False) -> List[Match]:
+        return self.search(self.embeddings.embed_query(query), top_k, include_values)
+
+    def fill_values(self, matches: List[Match]) -> None:
+        # NOTE: Matches found some other way (e.g. lexically) have no vector yet:
+        missing = defaultdict(list)
+        for match in matches:
+            if match.values is None:
+                missing[match.namespace].append(match.id)
+        for namespace, ids in missing.items():
+            vectors = self.index.fetch(ids=ids, namespace=namespace).vectors
+            for match in matches:
+                if match.values is None and match.namespace == namespace and match.id in vectors:
+                    match.values = list(vectors[match.id].values)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return hydrate(self.candidates(query, self.k))
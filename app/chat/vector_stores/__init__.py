@@ -0,0 +1,106 @@
+import os
+from collections import defaultdict
+from functools import partial
+from typing import Dict, List, Optional
+from app.chat.embeddings import get_embeddings
+from app.chat.retrievers import ContextPackingRetriever, HybridRetriever, MMRRetriever, VectorIndexRetriever
+from app.chat.vector_stores.upsert import UpsertEngine
+from app.web.api import get_document_owners
+
+# NOTE: none keeps every vector in the default namespace, user and document
+# give each owner or each document a namespace of its own:
+VECTOR_NAMESPACE_MODE = os.getenv("VECTOR_NAMESPACE_MODE", "none").lower()
+
+DEFAULT_RETRIEVER = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+
+_index = None
+
+
+def get_index():
+    # NOTE: Built on first use, resolving a Pinecone index is a network call:
+    global _index
+    if _index is None:
+        if os.getenv("VECTOR_STORE", "pinecone").lower() == "local":
+            from app.chat.vector_stores.local import LocalIndex
+            _index = LocalIndex(
+                os.getenv("VECTOR_STORE_PATH", "instance/vectors"),
+                dtype=os.getenv("VECTOR_STORE_DTYPE", "float32"),
+            )
+        else:
+            from app.chat.vector_stores.pinecone import build_index
+            _index = build_index()
+    return _index
+
+
+def set_index(index) -> None:
+    # NOTE: Swaps in another index with the same upsert/query/delete API:
+    global _index
+    _index = index
+
+
+def namespace_for(document_id: str, user_id: str, mode: str = VECTOR_NAMESPACE_MODE) -> Optional[str]:
+    if mode == "user":
+        return f"user-{user_id}"
+    if mode == "document":
+        return f"doc-{document_id}"
+    if mode == "none":
+        return None
+    raise ValueError(f"Unknown VECTOR_NAMESPACE_MODE: {mode}")
+
+
+def document_namespaces(document_ids: List[str], mode: str = VECTOR_NAMESPACE_MODE) -> Dict[Optional[str], List[str]]:
+    if mode == "none":
+        return {None: list(document_ids)}
+    owners = get_document_owners(document_ids)
+    partitions = defaultdict(list)
+    for document_id in document_ids:
+        partitions[namespace_for(document_id, owners.get(document_id), mode)].append(document_id)
+    return dict(partitions)
+
+
+def document_namespace(document_id: str) -> Optional[str]:
+    (namespace,) = document_namespaces([document_id])
+    return namespace
+
+
+def build_upsert_engine(**kwargs) -> UpsertEngine:
+    return UpsertEngine(get_index(), get_embeddings(), **kwargs)
+
+
+def delete_vectors(ids, namespace=None):
+    # NOTE: Pinecone accepts at most 1000 IDs per delete request:
+    index = get_index()
+    for i in range(0, len(ids), 1000):
+        index.delete(ids=ids[i : i + 1000], namespace=namespace)
+
+
+def build_retriever(chat_args, mode=None):
+    retriever = VectorIndexRetriever(
+        index=get_index(),
+        embeddings=get_embeddings(),
+        document_ids=chat_args.document_id,
+        partitions=document_namespaces(chat_args.document_id),
+    )
+    if (mode or DEFAULT_RETRIEVER) != "vector":
+        retriever = HybridRetriever(vector=retriever)
+    packing = chat_args.context_tokens != 0
+    retriever = MMRRetriever(
+        base=retriever,
+        # NOTE: With packing MMR orders every candidate and the token budget
+        # decides how many of them fit:
+        k=None if packing else chat_args.k,
+        fetch_k=chat_args.fetch_k,
+        lambda_mult=chat_args.mmr_lambda,
+        rerank=chat_args.rerank,
+    )
+    if not packing:
+        return retriever
+    if chat_args.context_tokens:
+        return ContextPackingRetriever(base=retriever, budget=chat_args.context_tokens)
+    return ContextPackingRetriever(base=retriever)
+
+
+retriever_map = {
+    "hybrid": partial(build_retriever, mode="hybrid"),
+    "vector": partial(build_retriever, mode="vector"),
+}
@@ -0,0 +1,320 @@
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_NAMESPACE = "__default__"
+
+
+@dataclass
+class LocalMatch:
+    id: str
+    score: float
+    metadata: Optional[Dict[str, Any]] = None
+    values: Optional[List[float]] = None
+
+
+@dataclass
+class LocalQueryResponse:
+    matches: List[LocalMatch] = field(default_factory=list)
+
+
+@dataclass
+class LocalFetchResponse:
+    vectors: Dict[str, LocalMatch] = field(default_factory=dict)
+
+
+class _Segment:
+    """
+    A batch of one document's vectors, memory-mapped read-only, with the
+    sidecar ID array and per-row metadata.
+    """
+
+    def __init__(self, directory: Path, version: str):
+        self.version = version
+        self.matrix = np.load(directory / f"vectors-{version}.npy", mmap_mode="r")
+        self.ids = np.load(directory / f"ids-{version}.npy")
+        with open(directory / f"metadata-{version}.json") as f:
+            self.metadata = json.load(f)
+        self.rows = {id: row for row, id in enumerate(self.ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _read_manifest(directory: Path) -> Optional[List[str]]:
+    try:
+        text = (directory / "CURRENT").read_text().strip()
+    except FileNotFoundError:
+        return None
+    # NOTE: Directories written before append-only segments name a single version:
+    return json.loads(text) if text.startswith("[") else [text]
+
+
+class LocalIndex:
+    """
+    An embedded vector index with the subset of the Pinecone Index API
+    that ingestion and retrieval use (upsert, query, fetch, delete).
+
+    Every document gets a directory of segments, each a float32 (or
+    float16) matrix of unit vectors plus a sidecar ID array. A query
+    filtered to a few documents only touches their segments, one matrix
+    product each, so per-document chat never scans the rest of the index.
+
+    Upserts append a segment with just the new rows, and merge the
+    smallest segments at the tail while they are not much larger than the
+    new one. Segment sizes then at least halve down the list, so a
+    document has O(log n) segments and ingesting it in batches rewrites
+    each row O(log n) times rather than once per batch.
+
+    Writes never touch a live segment file, they write new ones and then
+    swap the CURRENT manifest, so readers in other processes never see a
+    half written matrix. A per-document `flock` serializes writers.
+    """
+
+    def __init__(self, root: str, dtype: str = "float32"):
+        self.root = Path(root).resolve()
+        self.dtype = np.dtype(dtype)
+        self._segments: Dict[Path, List[_Segment]] = {}
+        self._locks: Dict[Path, threading.Lock] = defaultdict(threading.Lock)
+        self._thread_lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _namespace_dir(self, namespace: Optional[str]) -> Path:
+        return self.root / _safe_name(namespace or DEFAULT_NAMESPACE)
+
+    def _document_dir(self, namespace: Optional[str], document_id: str) -> Path:
+        return self._namespace_dir(namespace) / _safe_name(document_id)
+
+    @contextmanager
+    def _write_lock(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock:
+            thread_lock = self._locks[directory]
+        with thread_lock, open(directory / "write.lock", "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _segments_of(self, directory: Path, retries: int = 3) -> List[_Segment]:
+        versions = _read_manifest(directory)
+        if versions is None:
+            return []
+        cached = self._segments.get(directory) or []
+        if [segment.version for segment in cached] == versions:
+            return cached
+        loaded = {segment.version: segment for segment in cached}
+        try:
+            segments = [loaded.get(version) or _Segment(directory, version) for version in versions]
+        except FileNotFoundError:
+            # NOTE: A writer swapped in a newer manifest between the two reads:
+            if retries == 0:
+                raise
+            return self._segments_of(directory, retries - 1)
+        self._segments[directory] = segments
+        return segments
+
+    def _save_segment(self, directory: Path, ids: List[str], matrix: np.ndarray, metadata: List[Dict]) -> _Segment:
+        version = uuid.uuid4().hex
+        np.save(directory / f"vectors-{version}.npy", matrix.astype(self.dtype, copy=False))
+        np.save(directory / f"ids-{version}.npy", np.array(ids))
+        with open(directory / f"metadata-{version}.json", "w") as f:
+            json.dump(metadata, f)
+        return _Segment(directory, version)
+
+    def _without(self, directory: Path, segment: _Segment, doomed: set) -> Optional[_Segment]:
+        keep = [row for row, id in enumerate(segment.ids.tolist()) if id not in doomed]
+        if len(keep) == len(segment):
+            return segment
+        if not keep:
+            return None
+        return self._save_segment(
+            directory,
+            [segment.ids[row].item() for row in keep],
+            np.asarray(segment.matrix[keep], dtype=np.float32),
+            [segment.metadata[row] for row in keep],
+        )
+
+    def _commit(self, directory: Path, previous: List[_Segment], segments: List[_Segment]) -> None:
+        if not segments:
+            shutil.rmtree(directory, ignore_errors=True)
+            self._segments.pop(directory, None)
+            return
+        versions = [segment.version for segment in segments]
+        tmp = directory / f"CURRENT.{uuid.uuid4().hex}"
+        tmp.write_text(json.dumps(versions))
+        os.replace(tmp, directory / "CURRENT")
+        self._segments[directory] = segments
+        for segment in previous:
+            if segment.version in versions:
+                continue
+            # NOTE: Open memory maps of a dropped segment stay valid after unlink:
+            for name, suffix in (("vectors", "npy"), ("ids", "npy"), ("metadata", "json")):
+                (directory / f"{name}-{segment.version}.{suffix}").unlink(missing_ok=True)
+
+    def _document_dirs(self, namespace: Optional[str], filter: Optional[Dict]) -> List[Path]:
+        namespace_dir = self._namespace_dir(namespace)
+        document_ids = _filter_values((filter or {}).get("doc_id"))
+        if document_ids is None:
+            return sorted(path for path in namespace_dir.glob("*") if path.is_dir())
+        return [self._document_dir(namespace, document_id) for document_id in document_ids]
+
+    def upsert(self, vectors: Iterable, namespace: Optional[str] = None, **kwargs) -> Dict[str, int]:
+        by_document = defaultdict(list)
+        for record in vectors:
+            if isinstance(record, dict):
+                id, values, metadata = record["id"], record["values"], record.get("metadata") or {}
+            else:
+                id, values, metadata = record
+            by_document[_document_id(id, metadata)].append((id, values, dict(metadata)))
+
+        for document_id, records in by_document.items():
+            directory = self._document_dir(namespace, document_id)
+            with self._write_lock(directory):
+                ids = [id for id, _, _ in records]
+                matrix = _normalize(np.asarray([values for _, values, _ in records], dtype=np.float32))
+                metadata = [metadata for _, _, metadata in records]
+
+                previous = self._segments_of(directory)
+                # NOTE: An ID lives in one segment only, older copies go first:
+                replaced = set(ids)
+                segments = [segment for segment in (self._without(directory, segment, replaced) for segment in previous)
+                            if segment is not None]
+                while segments and len(segments[-1]) <= 2 * len(ids):
+                    tail = segments.pop()
+                    ids = tail.ids.tolist() + ids
+                    matrix = np.concatenate([np.asarray(tail.matrix, dtype=np.float32), matrix])
+                    metadata = tail.metadata + metadata
+                segments.append(self._save_segment(directory, ids, matrix, metadata))
+                self._commit(directory, previous, segments)
+        return {"upserted_count": sum(len(records) for records in by_document.values())}
+
+    def delete(self, ids: Optional[List[str]] = None, namespace: Optional[str] = None,
+               delete_all: bool = False, filter: Optional[Dict] = None, **kwargs) -> Dict:
+        if delete_all:
+            shutil.rmtree(self._namespace_dir(namespace), ignore_errors=True)
+            self._segments.clear()
+            return {}
+        if filter is not None:
+            for directory in self._document_dirs(namespace, filter):
+                with self._write_lock(directory):
+                    self._commit(directory, self._segments_of(directory), [])
+            return {}
+
+        for directory, doomed in self._group_ids(ids or [], namespace).items():
+            with self._write_lock(directory):
+                previous = self._segments_of(directory)
+                segments = [segment for segment in (self._without(directory, segment, doomed) for segment in previous)
+                            if segment is not None]
+                if [segment.version for segment in segments] != [segment.version for segment in previous]:
+                    self._commit(directory, previous, segments)
+        return {}
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None, **kwargs) -> LocalFetchResponse:
+        vectors = {}
+        for directory, wanted in self._group_ids(ids, namespace).items():
+            for segment in self._segments_of(directory):
+                for id in wanted:
+                    row = segment.rows.get(id)
+                    if row is not None:
+                        vectors[id] = LocalMatch(
+                            id=id,
+                            score=0.0,
+                            metadata=segment.metadata[row],
+                            values=np.asarray(segment.matrix[row], dtype=np.float32).tolist(),
+                        )
+        return LocalFetchResponse(vectors=vectors)
+
+    def query(self, vector: List[float], top_k: int = 4, filter: Optional[Dict] = None,
+              namespace: Optional[str] = None, include_metadata: bool = False,
+              include_values: bool = False, **kwargs) -> LocalQueryResponse:
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        extra_filter = {key: value for key, value in (filter or {}).items() if key != "doc_id"}
+
+        candidates = []
+        for directory in self._document_dirs(namespace, filter):
+            for segment in self._segments_of(directory):
+                scores = np.asarray(segment.matrix @ query.astype(segment.matrix.dtype), dtype=np.float32)
+                if extra_filter:
+                    mask = np.array([_matches(metadata, extra_filter) for metadata in segment.metadata], dtype=bool)
+                    scores = np.where(mask, scores, -np.inf)
+                if len(scores) > top_k:
+                    rows = np.argpartition(-scores, top_k - 1)[:top_k]
+                else:
+                    rows = np.arange(len(scores))
+                candidates.extend((float(scores[row]), segment, int(row)) for row in rows if scores[row] > -np.inf)
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return LocalQueryResponse(matches=[
+            LocalMatch(
+                id=segment.ids[row].item(),
+                score=score,
+                metadata=segment.metadata[row] if include_metadata else None,
+                values=np.asarray(segment.matrix[row], dtype=np.float32).tolist() if include_values else None,
+            )
+            for score, segment, row in candidates[:top_k]
+        ])
+
+    def _group_ids(self, ids: List[str], namespace: Optional[str]) -> Dict[Path, set]:
+        # NOTE: Chunk IDs start with their document ID, anything else needs a scan:
+        grouped = defaultdict(set)
+        unknown = []
+        for id in ids:
+            if "#" in id:
+                grouped[self._document_dir(namespace, id.split("#", 1)[0])].add(id)
+            else:
+                unknown.append(id)
+        if unknown:
+            for directory in self._document_dirs(namespace, None):
+                grouped[directory].update(unknown)
+        return grouped
+
+
+def _document_id(id: str, metadata: Dict) -> str:
+    if metadata.get("doc_id"):
+        return str(metadata["doc_id"])
+    if "#" in id:
+        return id.split("#", 1)[0]
+    raise ValueError(f"Vector {id} has no doc_id metadata")
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def _filter_values(condition) -> Optional[List[str]]:
+    if condition is None:
+        return None
+    if isinstance(condition, dict):
+        if "$in" in condition:
+            return list(condition["$in"])
+        if "$eq" in condition:
+            return [condition["$eq"]]
+        raise ValueError(f"Unsupported doc_id filter: {condition}")
+    return [condition]
+
+
+def _matches(metadata: Dict, filter: Dict) -> bool:
+    for key, condition in filter.items():
+        values = _filter_values(condition)
+        if metadata.get(key) not in values:
+            return False
+    return True
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(name))
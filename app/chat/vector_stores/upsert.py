@@ -0,0 +1,156 @@
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, ALL_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+import backoff
+from langchain_core.documents import Document
+
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))
+UPSERT_MAX_IN_FLIGHT = int(os.getenv("UPSERT_MAX_IN_FLIGHT", "4"))
+UPSERT_MAX_TRIES = int(os.getenv("UPSERT_MAX_TRIES", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    batch: int
+    size: int
+    embed_seconds: float = 0.0
+    upsert_seconds: float = 0.0
+    retries: int = 0
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        return self.embed_seconds + self.upsert_seconds
+
+
+@dataclass
+class _Batch:
+    number: int
+    ids: List[str]
+    docs: List[Document]
+    result: BatchResult = field(init=False)
+
+    def __post_init__(self):
+        self.result = BatchResult(batch=self.number, size=len(self.docs))
+
+
+class UpsertEngine:
+    """
+    Embeds and upserts batches of chunks on a bounded thread pool.
+
+    `submit` blocks once `max_in_flight` batches are outstanding, which
+    pushes back on the ingestion generator instead of buffering the whole
+    document. Embedding and each upsert request are retried with
+    exponential backoff on their own, so a failed request never re-sends
+    the requests of the batch that already succeeded. Completed batches are
+    handed to `on_result` on the submitting thread.
+    """
+
+    def __init__(
+        self,
+        index,
+        embeddings,
+        upsert_batch_size: int = UPSERT_BATCH_SIZE,
+        max_in_flight: int = UPSERT_MAX_IN_FLIGHT,
+        max_tries: int = UPSERT_MAX_TRIES,
+        namespace: Optional[str] = None,
+        on_result: Optional[Callable[[BatchResult], None]] = None,
+    ):
+        self.index = index
+        self.embeddings = embeddings
+        self.upsert_batch_size = upsert_batch_size
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_tries = max_tries
+        self.namespace = namespace
+        self.on_result = on_result
+        self.results: List[BatchResult] = []
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="upsert")
+        self._pending: set[Future] = set()
+        self._batches = 0
+
+    def submit(self, docs: List[Document], ids: Optional[List[str]] = None) -> None:
+        while len(self._pending) >= self.max_in_flight:
+            self._collect(FIRST_COMPLETED)
+        ids = ids or [str(uuid.uuid4()) for _ in docs]
+        batch = _Batch(self._batches, ids, docs)
+        self._batches += 1
+        self._pending.add(self._executor.submit(self._run, batch))
+
+    def flush(self) -> List[BatchResult]:
+        while self._pending:
+            self._collect()
+        return self.results
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc, value, tb):
+        try:
+            if exc is None:
+                self.flush()
+        finally:
+            self.close()
+        return False
+
+    def summary(self) -> dict:
+        latencies = sorted(result.seconds for result in self.results)
+        if not latencies:
+            return {}
+        return {
+            "batches": len(latencies),
+            "retries": sum(result.retries for result in self.results),
+            "batch_p50": latencies[len(latencies) // 2],
+            "batch_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "batch_max": latencies[-1],
+        }
+
+    def _collect(self, return_when=ALL_COMPLETED) -> None:
+        done, self._pending = wait(self._pending, return_when=return_when)
+        for future in done:
+            result = future.result()
+            self.results.append(result)
+            logger.debug(
+                "Batch %d: %d vectors, embed %.3fs, upsert %.3fs, %d retries",
+                result.batch, result.size, result.embed_seconds, result.upsert_seconds, result.retries,
+            )
+            if self.on_result:
+                self.on_result(result)
+
+    def _retrying(self, fn, result: BatchResult):
+        def count_retry(details):
+            result.retries += 1
+            logger.warning("Retrying batch %d after %s", result.batch, details.get("exception"))
+
+        return backoff.on_exception(
+            backoff.expo,
+            Exception,
+            max_tries=self.max_tries,
+            on_backoff=count_retry,
+        )(fn)
+
+    def _run(self, batch: _Batch) -> BatchResult:
+        result = batch.result
+        start = time.perf_counter()
+        embed = self._retrying(self.embeddings.embed_documents, result)
+        vectors = embed([doc.page_content for doc in batch.docs])
+        result.embed_seconds = time.perf_counter() - start
+
+        records = [
+            (id, vector, doc.metadata)
+            for id, vector, doc in zip(batch.ids, vectors, batch.docs)
+        ]
+        upsert = self._retrying(self.index.upsert, result)
+        start = time.perf_counter()
+        for i in range(0, len(records), self.upsert_batch_size):
+            upsert(vectors=records[i : i + self.upsert_batch_size], namespace=self.namespace)
+        result.upsert_seconds = time.perf_counter() - start
+        return result
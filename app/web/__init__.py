@@ -3,6 +3,7 @@ from flask_cors import CORS
 from app.web.config import Config
 from app.celery import celery_init_app
 from app.web.db import db, init_db_command
+from app.web.commands import migrate_namespaces_command
 from app.web.hooks import (
     load_logged_in_user,
     add_headers,
@@ -31,6 +32,7 @@ def create_app():
 def register_db(app):
     db.init_app(app)
     app.cli.add_command(init_db_command)
+    app.cli.add_command(migrate_namespaces_command)
 
 def register_blueprint(app):
     app.register_blueprint(auth_views.bp)
@@ -1,9 +1,12 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 from app.web.db import db
 from app.web.db.models import Message
 from app.web.db.models import Conversation
+from app.web.db.models import Chunk
+from app.web.db.models import Document
+from app.web.db.models import CachedAnswer, cached_answer_document
 
 
 def get_messages_by_conversation_id(
@@ -49,3 +52,143 @@ def get_conversation_components(
         "retriever": conversation.retriever,
         "memory": conversation.memory
     }
+
+
+def get_document_owners(
+        document_ids: List[str]
+) -> Dict[str, str]:
+    rows = db.session.execute(
+        db.select(Document.id, Document.user_id).where(Document.id.in_(document_ids))
+    )
+    return {document_id: user_id for document_id, user_id in rows}
+
+
+def add_chunks(
+        chunks: List[Dict]
+) -> None:
+    if chunks:
+        db.session.execute(db.insert(Chunk), chunks)
+        db.session.commit()
+
+
+def get_chunks(
+        chunk_ids: List[str]
+) -> Dict[str, Dict]:
+    if not chunk_ids:
+        return {}
+    rows = db.session.execute(
+        db.select(Chunk.id, Chunk.text, Chunk.position, Chunk.page).where(Chunk.id.in_(chunk_ids))
+    )
+    return {
+        chunk_id: {"text": text, "position": position, "page": page}
+        for chunk_id, text, position, page in rows
+    }
+
+
+def get_document_chunks(
+        document_id: str
+) -> List[tuple]:
+    rows = db.session.execute(
+        db.select(Chunk.id, Chunk.text).filter_by(document_id=document_id).order_by(Chunk.position)
+    )
+    return [(chunk_id, text) for chunk_id, text in rows]
+
+
+def get_chunk_positions(
+        document_id: str
+) -> Dict[str, int]:
+    rows = db.session.execute(
+        db.select(Chunk.id, Chunk.position).filter_by(document_id=document_id)
+    )
+    return {chunk_id: position for chunk_id, position in rows}
+
+
+def update_chunk_positions(
+        positions: List[Dict]
+) -> None:
+    if positions:
+        db.session.execute(db.update(Chunk), positions)
+        db.session.commit()
+
+
+def delete_chunks(
+        chunk_ids: List[str]
+) -> None:
+    for i in range(0, len(chunk_ids), 500):
+        db.session.execute(db.delete(Chunk).where(Chunk.id.in_(chunk_ids[i : i + 500])))
+    db.session.commit()
+
+
+def get_cached_answers(
+        scope: str
+) -> List[Dict]:
+    rows = db.session.execute(
+        db.select(CachedAnswer.id, CachedAnswer.embedding, CachedAnswer.question, CachedAnswer.answer).filter_by(scope=scope)
+    )
+    return [
+        {"id": id, "embedding": embedding, "question": question, "answer": answer}
+        for id, embedding, question, answer in rows
+    ]
+
+
+def add_cached_answer(
+        scope: str,
+        document_ids: List[str],
+        template: Optional[str],
+        question: str,
+        answer: str,
+        embedding: bytes,
+        max_entries: int
+) -> None:
+    cached = CachedAnswer.create(
+        commit=False,
+        scope=scope,
+        template=template,
+        question=question,
+        answer=answer,
+        embedding=embedding,
+    )
+    db.session.flush()
+    db.session.execute(
+        db.insert(cached_answer_document),
+        [{"cached_answer_id": cached.id, "document_id": document_id} for document_id in set(document_ids)],
+    )
+    # NOTE: Past max_entries the least recently useful answers in the scope go first:
+    stale = db.session.execute(
+        db.select(CachedAnswer.id)
+        .filter_by(scope=scope)
+        .order_by(db.func.coalesce(CachedAnswer.last_hit_on, CachedAnswer.created_on).desc())
+        .offset(max_entries)
+    ).scalars().all()
+    _delete_cached_answers(stale)
+    db.session.commit()
+
+
+def record_cached_answer_hit(
+        cached_answer_id: str
+) -> None:
+    db.session.execute(
+        db.update(CachedAnswer)
+        .where(CachedAnswer.id == cached_answer_id)
+        .values(hits=CachedAnswer.hits + 1, last_hit_on=db.func.now())
+    )
+    db.session.commit()
+
+
+def invalidate_cached_answers(
+        document_id: str
+) -> None:
+    ids = db.session.execute(
+        db.select(cached_answer_document.c.cached_answer_id).where(cached_answer_document.c.document_id == document_id)
+    ).scalars().all()
+    _delete_cached_answers(ids)
+    db.session.commit()
+
+
+def _delete_cached_answers(
+        cached_answer_ids: List[str]
+) -> None:
+    for i in range(0, len(cached_answer_ids), 500):
+        batch = cached_answer_ids[i : i + 500]
+        db.session.execute(db.delete(cached_answer_document).where(cached_answer_document.c.cached_answer_id.in_(batch)))
+        db.session.execute(db.delete(CachedAnswer).where(CachedAnswer.id.in_(batch)))
@@ -0,0 +1,92 @@
+import click
+from flask import current_app
+from app.web.db import db
+from app.web.db.models import Chunk, Document
+
+
+# NOTE: Pinecone's top_k limit for queries without metadata or values:
+LIST_LIMIT = 10000
+
+
+def _listed_ids(index, probe, document_id, namespace):
+    # NOTE: Indexes cannot list by metadata, a filtered query finds the
+    # vectors ingested before the chunk store, which have random IDs:
+    response = index.query(
+        vector=probe,
+        top_k=LIST_LIMIT,
+        filter={"doc_id": {"$in": [document_id]}},
+        namespace=namespace,
+        include_metadata=False,
+        include_values=False,
+    )
+    return [match.id for match in response.matches]
+
+
+@click.command("migrate-namespaces")
+@click.option("--mode", type=click.Choice(["user", "document"]), default=None,
+              help="Target namespace mode, defaults to VECTOR_NAMESPACE_MODE.")
+@click.option("--source-namespace", default="", help="Namespace the vectors are in now, the default one if empty.")
+@click.option("--batch-size", default=100, show_default=True)
+@click.option("--keep-source", is_flag=True, help="Copy instead of move.")
+def migrate_namespaces_command(mode, source_namespace, batch_size, keep_source):
+    """Moves every document's vectors into its own namespace, those in the chunk store and those found by doc_id."""
+    from app.chat.embeddings import get_embeddings
+    from app.chat.vector_stores import VECTOR_NAMESPACE_MODE, get_index, namespace_for
+
+    mode = mode or VECTOR_NAMESPACE_MODE
+    if mode == "none":
+        raise click.UsageError("Pass --mode or set VECTOR_NAMESPACE_MODE to user or document.")
+    source = source_namespace or None
+    index = get_index()
+    # NOTE: Any vector of the index's width does for listing, all that matters is the filter:
+    probe = get_embeddings().embed_query("migrate-namespaces")
+
+    def migrate(ids, target):
+        count = 0
+        for i in range(0, len(ids), batch_size):
+            vectors = index.fetch(ids=ids[i : i + batch_size], namespace=source).vectors
+            if not vectors:
+                continue
+            index.upsert(
+                vectors=[(id, list(vector.values), dict(vector.metadata or {})) for id, vector in vectors.items()],
+                namespace=target,
+            )
+            # NOTE: Only what was written to the target is removed from the source:
+            if not keep_source:
+                index.delete(ids=list(vectors), namespace=source)
+            count += len(vectors)
+        return count
+
+    with current_app.app_context():
+        documents = db.session.execute(db.select(Document.id, Document.user_id)).all()
+        moved = 0
+        for document_id, user_id in documents:
+            target = namespace_for(document_id, user_id, mode)
+            if target == source:
+                continue
+            chunk_ids = db.session.execute(
+                db.select(Chunk.id).filter_by(document_id=document_id).order_by(Chunk.position)
+            ).scalars().all()
+            done = set(chunk_ids)
+            count = migrate(list(chunk_ids), target)
+            while True:
+                listed = _listed_ids(index, probe, document_id, source)
+                pending = [id for id in listed if id not in done]
+                # NOTE: A full listing may hide more vectors, copies never shrink
+                # it and moved ones can still be listed until the delete lands:
+                if len(listed) >= LIST_LIMIT and (keep_source or not pending):
+                    raise click.ClickException(
+                        f"{document_id} has more than {LIST_LIMIT} vectors to list, "
+                        "run without --keep-source, or again once deletes have landed."
+                    )
+                if not pending:
+                    break
+                done.update(pending)
+                count += migrate(pending, target)
+                # NOTE: Copies leave the source as it was, a second listing finds nothing new:
+                if keep_source:
+                    break
+            moved += count
+            legacy = len(done) - len(chunk_ids)
+            click.echo(f"{document_id}: {count} vectors ({legacy} without chunk rows) -> {target}")
+    click.echo(f"{'Copied' if keep_source else 'Moved'} {moved} vectors.")
@@ -9,6 +9,20 @@ class Config:
     ACCOUNT_NAME = os.getenv('ACCOUNT_NAME')
     ACCOUNT_KEY = os.getenv('ACCOUNT_KEY')
     CONTAINER_NAME = os.getenv('CONTAINER_NAME')
+    # NOTE: azure or local, the local backend keeps blobs under STORAGE_LOCAL_ROOT:
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'azure').lower()
+    STORAGE_LOCAL_ROOT = os.getenv('STORAGE_LOCAL_ROOT', 'instance/blobs')
+    STORAGE_POOL_SIZE = int(os.getenv('STORAGE_POOL_SIZE', 16))
+    # NOTE: Large blobs move as parallel blocks/ranges of STORAGE_BLOCK_SIZE bytes:
+    STORAGE_BLOCK_SIZE = int(os.getenv('STORAGE_BLOCK_SIZE', 8 * 1024 * 1024))
+    STORAGE_CONCURRENCY = int(os.getenv('STORAGE_CONCURRENCY', 4))
+    # NOTE: Downloaded source files are kept for re-processing, 0 disables the cache:
+    SOURCE_CACHE_DIR = os.getenv('SOURCE_CACHE_DIR', 'instance/source_cache')
+    SOURCE_CACHE_MAX_BYTES = int(os.getenv('SOURCE_CACHE_MAX_BYTES', 5 * 1024 ** 3))
+    # NOTE: Uploads are spooled here for the ingestion worker. Set SHARED_UPLOAD_SPOOL=false
+    # when the worker can't see the web server's disk, uploads then go to blob storage first:
+    UPLOAD_SPOOL_DIR = os.getenv('UPLOAD_SPOOL_DIR', 'instance/uploads')
+    SHARED_UPLOAD_SPOOL = os.getenv('SHARED_UPLOAD_SPOOL', 'true').lower() == 'true'
     CELERY = {
         "broker_url": os.getenv("REDIS_URI", False),
         "task_ignore_result": True,
@@ -3,4 +3,7 @@ from .doc import Document
 from .conversation import Conversation
 from .message import Message
 from .analyze_results import AnalyzeResults
-from .base import BaseModel as Model
\ No newline at end of file
+from .ingestion_job import IngestionJob
+from .chunk import Chunk
+from .cached_answer import CachedAnswer, cached_answer_document
+from .base import BaseModel as Model
@@ -0,0 +1,38 @@
+import uuid
+from app.web.db import db
+from .base import BaseModel
+
+# NOTE: Every document an answer was grounded on, so re-ingesting any of them drops it:
+cached_answer_document = db.Table(
+    "cached_answer_document",
+    db.Column("cached_answer_id", db.String(), db.ForeignKey("cached_answer.id"), primary_key=True),
+    db.Column("document_id", db.String(), db.ForeignKey("document.id"), primary_key=True, index=True),
+)
+
+
+class CachedAnswer(BaseModel):
+    __tablename__ = "cached_answer"
+
+    id: str = db.Column(db.String(), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # NOTE: scope is a hash of the sorted document IDs and the template:
+    scope: str = db.Column(db.String(), nullable=False, index=True)
+    template: str = db.Column(db.Text())
+    question: str = db.Column(db.Text(), nullable=False)
+    answer: str = db.Column(db.Text(), nullable=False)
+    # NOTE: The question's unit vector as float32 bytes:
+    embedding: bytes = db.Column(db.LargeBinary(), nullable=False)
+    hits: int = db.Column(db.Integer, nullable=False, default=0)
+    created_on = db.Column(db.DateTime(), nullable=False, server_default=db.func.now())
+    last_hit_on = db.Column(db.DateTime())
+
+    documents = db.relationship("Document", secondary=cached_answer_document)
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "question": self.question,
+            "answer": self.answer,
+            "hits": self.hits,
+            "created_on": self.created_on,
+            "last_hit_on": self.last_hit_on,
+        }
@@ -0,0 +1,25 @@
+from app.web.db import db
+from .base import BaseModel
+
+
+class Chunk(BaseModel):
+    # NOTE: The text of every embedded chunk lives here, the vector index only
+    # keeps doc_id and chunk_id as metadata:
+    id: str = db.Column(db.String(), primary_key=True)
+    position: int = db.Column(db.Integer, nullable=False)
+    page: int = db.Column(db.Integer)
+    tokens: int = db.Column(db.Integer)
+    text: str = db.Column(db.Text(), nullable=False)
+
+    document_id: str = db.Column(db.String(), db.ForeignKey("document.id"), nullable=False, index=True)
+    document = db.relationship("Document", back_populates="chunks")
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "document_id": self.document_id,
+            "position": self.position,
+            "page": self.page,
+            "tokens": self.tokens,
+            "text": self.text,
+        }
@@ -17,6 +17,11 @@ class Document(BaseModel):
                                    order_by="desc(Conversation.created_on)"
                                    )
     analyze_results = db.relationship("AnalyzeResults", back_populates="document")
+    ingestion_jobs = db.relationship("IngestionJob",
+                                     back_populates="document",
+                                     order_by="desc(IngestionJob.created_on)"
+                                     )
+    chunks = db.relationship("Chunk", back_populates="document", order_by="Chunk.position")
     
     def as_dict(self):
         return {
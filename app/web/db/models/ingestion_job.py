@@ -0,0 +1,51 @@
+import uuid
+from app.web.db import db
+from .base import BaseModel
+
+
+class IngestionJob(BaseModel):
+    __tablename__ = "ingestion_job"
+
+    id: str = db.Column(db.String(), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # NOTE: status is one of queued, running, succeeded, failed
+    status: str = db.Column(db.String(), nullable=False, default="queued")
+    # NOTE: stage is one of download, parse, chunk, embed, upsert, index
+    stage: str = db.Column(db.String())
+    pages: int = db.Column(db.Integer, nullable=False, default=0)
+    chunks: int = db.Column(db.Integer, nullable=False, default=0)
+    vectors: int = db.Column(db.Integer, nullable=False, default=0)
+    tokens: int = db.Column(db.Integer, nullable=False, default=0)
+    # NOTE: Chunks already indexed with the same ID, and stale chunks removed on re-ingestion:
+    skipped: int = db.Column(db.Integer, nullable=False, default=0)
+    deleted: int = db.Column(db.Integer, nullable=False, default=0)
+    timings = db.Column(db.JSON, nullable=False, default=dict)
+    error: str = db.Column(db.String())
+    created_on = db.Column(db.DateTime(), nullable=False, server_default=db.func.now())
+    started_on = db.Column(db.DateTime())
+    finished_on = db.Column(db.DateTime())
+
+    document_id: str = db.Column(db.String(), db.ForeignKey("document.id"), nullable=False)
+    document = db.relationship("Document", back_populates="ingestion_jobs")
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "document_id": self.document_id,
+            "status": self.status,
+            "stage": self.stage,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "vectors": self.vectors,
+            "tokens": self.tokens,
+            "skipped": self.skipped,
+            "deleted": self.deleted,
+            "timings": self.timings or {},
+            "error": self.error,
+            "created_on": self.created_on,
+            "started_on": self.started_on,
+            "finished_on": self.finished_on,
+        }
@@ -1,36 +1,38 @@
 import os
-import requests
 import tempfile
-from flask import g, current_app
-from azure.storage.blob import BlobServiceClient
+from functools import cache
 from app.web.config import Config
 from app.web.db.models import Document
+from app.web.storage import get_storage, upload_file, download_file, BlobExistsError, SourceCache
 
-connection_string = f"DefaultEndpointsProtocol=https;AccountName={Config.ACCOUNT_NAME};AccountKey={Config.ACCOUNT_KEY};EndpointSuffix=core.windows.net"
 
+@cache
+def _source_cache():
+    if Config.SOURCE_CACHE_MAX_BYTES <= 0:
+        return None
+    return SourceCache(Config.SOURCE_CACHE_DIR, Config.SOURCE_CACHE_MAX_BYTES)
 
-def upload(local_file_path, file_name):
 
-    blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-    if g.user is None:
-        return {"message":"Unauthorized"}, 401
-    user_name = g.user.id
+def upload(local_file_path, file_name, user_id):
+    folder_name = f"{user_id}/{file_name}"
+    try:
+        upload_file(get_storage(), folder_name, local_file_path)
+    except BlobExistsError:
+        # NOTE: Never replace the source file of an existing document:
+        return {"message": f"A file named {file_name} already exists"}, 409
+    return {"message":"File uploaded successfully!"}, 200
 
-    folder_name = f"{user_name}/{file_name}"
-    blob_client = blob_service_client.get_blob_client(container=Config.CONTAINER_NAME, blob=folder_name)
-    with open(local_file_path, "rb") as f:
-        blob_client.upload_blob(f)
-        return {"message":"File uploaded successfully!"}, 200
+
+def exists(file_name, user_id):
+    return get_storage().exists(f"{user_id}/{file_name}")
     
 def create_download_url(file_id):
-    blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+    storage = get_storage()
     doc = Document.find_by(id=file_id).as_dict()
     url = []
-    blob_client = blob_service_client.get_blob_client(container=Config.CONTAINER_NAME, blob=f"{g.user.id}/{doc["name"]}")
-    url.append(blob_client.url)
+    url.append(storage.url(f"{doc["user_id"]}/{doc["name"]}"))
     if doc["document_ext"] == "wav" or doc["document_ext"] == "mp3":
-        blob_client = blob_service_client.get_blob_client(container=Config.CONTAINER_NAME, blob=f"{g.user.id}/{doc["name"].split(".")[0]}.txt")
-        url.append(blob_client.url)
+        url.append(storage.url(f"{doc["user_id"]}/{doc["name"].split(".")[0]}.txt"))
     return url
 
 def download(file_id):
@@ -41,22 +43,37 @@ def download(file_id):
 class _Download:
     def __init__(self, file_id):
         self.file_id = file_id
-        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = None
+        self.lease = None
         self.file_path = ""
 
     def download(self):
-        self.file_path = os.path.join(self.temp_dir.name, self.file_id)
-        download_url = create_download_url(self.file_id)[0];
-        print(download_url)
-        response = requests.get(download_url, stream=True)
-        with open(self.file_path, "wb") as file:
-            for chunk in response.iter_content(chunk_size=8192):
-                file.write(chunk)
+        doc = Document.find_by(id=self.file_id)
+        storage = get_storage()
+        blob_name = f"{doc.user_id}/{doc.name}"
+        source_cache = _source_cache()
+        if source_cache is not None:
+            # NOTE: Served from the host's source cache while the blob's ETag is unchanged.
+            # The file is shared, callers must only read it:
+            self.lease = source_cache.acquire(
+                doc.id,
+                storage.etag(blob_name),
+                lambda path: download_file(storage, blob_name, path),
+            )
+            self.file_path = str(self.lease.path)
+            return self.file_path
 
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, self.file_id)
+        # NOTE: Parallel range requests into a preallocated file:
+        download_file(storage, blob_name, self.file_path)
         return self.file_path
 
     def cleanup(self):
-        self.temp_dir.cleanup()
+        if self.lease is not None:
+            self.lease.release()
+        if self.temp_dir is not None:
+            self.temp_dir.cleanup()
 
     def __enter__(self):
         return self.download()
@@ -1,10 +1,10 @@
 import functools
 import os
-import tempfile
 import uuid
 import logging
 from flask import g, session, request
 from flask import session
+from app.web.config import Config
 from app.web.db.models import User, Model
 from werkzeug.exceptions import Unauthorized, BadRequest
 from sqlalchemy.exc import IntegrityError, NoResultFound
@@ -66,15 +66,21 @@ def handle_file_upload(fn):
     def wrapper(**kwargs):
        file = request.files["file"]
        file_id = str(uuid.uuid4())
-       with tempfile.TemporaryDirectory() as tmpdir:
-            file_path = os.path.join(tmpdir, file_id)
-            file.save(file_path)
-            kwargs["file_path"] = file_path
-            kwargs["file_id"] = file_id
-            kwargs["file_name"] = file.filename
-            kwargs["file_size"] = file.content_length
-            kwargs["file_extension"] = file.filename.split(".")[-1]
+       # NOTE: The file outlives the request, the ingestion task owns it once the view returns:
+       os.makedirs(Config.UPLOAD_SPOOL_DIR, exist_ok=True)
+       file_path = os.path.abspath(os.path.join(Config.UPLOAD_SPOOL_DIR, file_id))
+       file.save(file_path)
+       kwargs["file_path"] = file_path
+       kwargs["file_id"] = file_id
+       kwargs["file_name"] = file.filename
+       kwargs["file_size"] = file.content_length
+       kwargs["file_extension"] = file.filename.split(".")[-1]
+       try:
             return fn(**kwargs)
+       except Exception:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
     return wrapper
 
 def handle_error(err):
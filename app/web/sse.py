@@ -0,0 +1,99 @@
+import json
+import os
+import time
+from typing import Iterable, Iterator, Optional
+
+SSE_COALESCE_SECONDS = float(os.getenv("SSE_COALESCE_MS", "50")) / 1000
+SSE_COALESCE_CHARS = int(os.getenv("SSE_COALESCE_CHARS", "256"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "10"))
+
+
+def event(data: str, name: Optional[str] = None) -> str:
+    # NOTE: Every line of the payload needs its own data: field:
+    lines = [f"event: {name}"] if name else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+def json_event(payload, name: Optional[str] = None) -> str:
+    return event(json.dumps(payload, default=str), name)
+
+
+def comment(text: str = "") -> str:
+    # NOTE: Ignored by clients, but keeps proxies from closing an idle stream:
+    return f": {text}\n\n"
+
+
+def sse_response(events: Iterable[str]):
+    # NOTE: Imported here so the framing above has no Flask dependency:
+    from flask import Response, stream_with_context
+
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def token_events(
+    tokens: Iterator[str],
+    coalesce_seconds: float = SSE_COALESCE_SECONDS,
+    coalesce_chars: int = SSE_COALESCE_CHARS,
+    heartbeat_seconds: float = SSE_HEARTBEAT_SECONDS,
+) -> Iterator[str]:
+    """
+    Frames a token stream as SSE. Tokens are coalesced into one "token"
+    event per `coalesce_seconds` or `coalesce_chars`, whichever comes
+    first, a heartbeat comment goes out after `heartbeat_seconds` without
+    a write, and a final "done" event carries the stream's timings.
+
+    `tokens` yields "" when no token arrived for a while, which is what
+    lets a window close or a heartbeat go out before the next token.
+    """
+    start = time.perf_counter()
+    last_write = last_flush = start
+    first_token = None
+    buffer, size, count, frames = [], 0, 0, 0
+
+    try:
+        for token in tokens:
+            now = time.perf_counter()
+            if token:
+                if first_token is None:
+                    first_token = now
+                buffer.append(token)
+                size += len(token)
+                count += 1
+            if buffer and (size >= coalesce_chars or now - last_flush >= coalesce_seconds):
+                yield json_event({"text": "".join(buffer)}, "token")
+                buffer, size = [], 0
+                frames += 1
+                last_write = last_flush = now
+            elif now - last_write >= heartbeat_seconds:
+                yield comment("heartbeat")
+                last_write = now
+            if not buffer:
+                last_flush = now
+    except Exception as e:
+        # NOTE: Includes failures of the chain itself, re-raised by the token stream:
+        if buffer:
+            yield json_event({"text": "".join(buffer)}, "token")
+        yield json_event({"message": str(e)}, "error")
+        return
+    finally:
+        # NOTE: Also reached when the client disconnects and the server closes this
+        # generator, closing the token stream is what stops generation:
+        close = getattr(tokens, "close", None)
+        if close is not None:
+            close()
+
+    if buffer:
+        yield json_event({"text": "".join(buffer)}, "token")
+        frames += 1
+    end = time.perf_counter()
+    yield json_event({
+        "tokens": count,
+        "frames": frames,
+        "first_token_ms": round((first_token - start) * 1000, 1) if first_token else None,
+        "total_ms": round((end - start) * 1000, 1),
+    }, "done")
@@ -0,0 +1,4 @@
+from .backends import AzureBlobBackend, BlobExistsError, LocalDiskBackend
+from .transfer import upload_file, download_file
+from .pool import get_storage
+from .cache import SourceCache, CacheLease
@@ -0,0 +1,134 @@
+import os
+import shutil
+from pathlib import Path
+from typing import List
+
+
+class BlobExistsError(Exception):
+    pass
+
+
+class AzureBlobBackend:
+    """
+    Block and range primitives over one Azure Blob Storage container.
+    """
+
+    def __init__(self, container_client):
+        self.container_client = container_client
+
+    def _blob(self, name: str):
+        return self.container_client.get_blob_client(name)
+
+    def url(self, name: str) -> str:
+        return self._blob(name).url
+
+    def size(self, name: str) -> int:
+        return self._blob(name).get_blob_properties().size
+
+    def etag(self, name: str) -> str:
+        return self._blob(name).get_blob_properties().etag
+
+    def exists(self, name: str) -> bool:
+        return self._blob(name).exists()
+
+    def put(self, name: str, data: bytes, overwrite: bool = False) -> None:
+        from azure.core.exceptions import ResourceExistsError
+
+        try:
+            self._blob(name).upload_blob(data, overwrite=overwrite)
+        except ResourceExistsError as e:
+            raise BlobExistsError(name) from e
+
+    def read_range(self, name: str, offset: int, length: int) -> bytes:
+        return self._blob(name).download_blob(offset=offset, length=length).readall()
+
+    def stage_block(self, name: str, block_id: str, data: bytes) -> None:
+        self._blob(name).stage_block(block_id, data, length=len(data))
+
+    def commit_blocks(self, name: str, block_ids: List[str], overwrite: bool = False) -> None:
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceExistsError, ResourceModifiedError
+        from azure.storage.blob import BlobBlock
+
+        # NOTE: If-None-Match: *, the commit fails if the blob exists by then:
+        conditions = {} if overwrite else {"etag": "*", "match_condition": MatchConditions.IfMissing}
+        try:
+            self._blob(name).commit_block_list([BlobBlock(block_id=block_id) for block_id in block_ids], **conditions)
+        except (ResourceExistsError, ResourceModifiedError) as e:
+            raise BlobExistsError(name) from e
+
+
+class LocalDiskBackend:
+    """
+    The same primitives on a local directory. Staged blocks are kept in a
+    hidden directory until they are committed into the final file.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name: str) -> Path:
+        path = (self.root / name).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid blob name: {name}")
+        return path
+
+    def _blocks_dir(self, name: str) -> Path:
+        return self.root / ".blocks" / name.replace("/", "__")
+
+    def url(self, name: str) -> str:
+        return self._path(name).as_uri()
+
+    def size(self, name: str) -> int:
+        return self._path(name).stat().st_size
+
+    def etag(self, name: str) -> str:
+        stat = self._path(name).stat()
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def exists(self, name: str) -> bool:
+        return self._path(name).exists()
+
+    def _publish(self, tmp_path: Path, path: Path, name: str, overwrite: bool) -> None:
+        if overwrite:
+            os.replace(tmp_path, path)
+            return
+        # NOTE: A hard link fails if the target exists, unlike a rename:
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError as e:
+            raise BlobExistsError(name) from e
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def put(self, name: str, data: bytes, overwrite: bool = False) -> None:
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(data)
+        self._publish(tmp_path, path, name, overwrite)
+
+    def read_range(self, name: str, offset: int, length: int) -> bytes:
+        with open(self._path(name), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def stage_block(self, name: str, block_id: str, data: bytes) -> None:
+        blocks_dir = self._blocks_dir(name)
+        blocks_dir.mkdir(parents=True, exist_ok=True)
+        (blocks_dir / block_id.replace("/", "_")).write_bytes(data)
+
+    def commit_blocks(self, name: str, block_ids: List[str], overwrite: bool = False) -> None:
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        blocks_dir = self._blocks_dir(name)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as out:
+            for block_id in block_ids:
+                with open(blocks_dir / block_id.replace("/", "_"), "rb") as block:
+                    shutil.copyfileobj(block, out)
+        try:
+            self._publish(tmp_path, path, name, overwrite)
+        finally:
+            shutil.rmtree(blocks_dir, ignore_errors=True)
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class CacheLease:
+    """
+    A cached file held open for reading. The shared lock keeps other
+    workers from evicting it until `release` is called.
+    """
+
+    def __init__(self, path: Path, lock_file):
+        self.path = path
+        self._lock_file = lock_file
+
+    def release(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+class SourceCache:
+    """
+    Size-bounded on-disk LRU of downloaded source files, keyed by
+    document ID and blob ETag so a changed blob is never served stale.
+
+    Files are written to a temp name and renamed into place, and every
+    key has its own lock file: `flock` makes concurrent Celery workers on
+    the host wait for a single download instead of racing, and lets
+    eviction skip files another worker is still reading.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root).resolve()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._thread_lock = threading.Lock()
+        for sub in ("data", "locks", "tmp"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+
+    def _key(self, document_id: str, etag: str) -> str:
+        return f"{document_id}-{hashlib.sha256(etag.encode()).hexdigest()[:16]}"
+
+    @contextmanager
+    def _exclusive(self, lock_path: Path, blocking: bool = True):
+        lock_file = open(lock_path, "a+")
+        try:
+            if fcntl is None:
+                with self._thread_lock:
+                    yield True
+                return
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+        finally:
+            lock_file.close()
+
+    def acquire(self, document_id: str, etag: str, fill: Callable[[str], None]) -> CacheLease:
+        key = self._key(document_id, etag)
+        path = self.root / "data" / key
+        lock_file = open(self.root / "locks" / f"{key}.lock", "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if path.exists():
+                self.hits += 1
+                # NOTE: mtime doubles as last-use time, atime is often disabled:
+                os.utime(path)
+            else:
+                self.misses += 1
+                tmp_path = self.root / "tmp" / f"{key}.{os.getpid()}.{threading.get_ident()}"
+                try:
+                    fill(str(tmp_path))
+                    os.replace(tmp_path, path)
+                finally:
+                    if tmp_path.exists():
+                        tmp_path.unlink()
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_SH)
+        except BaseException:
+            lock_file.close()
+            raise
+        self._evict(keep=path)
+        return CacheLease(path, lock_file)
+
+    def _evict(self, keep: Path) -> None:
+        with self._exclusive(self.root / "evict.lock") as locked:
+            if not locked:
+                return
+            entries = []
+            for path in (self.root / "data").iterdir():
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    return
+                if path == keep:
+                    continue
+                with self._exclusive(self.root / "locks" / f"{path.name}.lock", blocking=False) as idle:
+                    if idle:
+                        path.unlink(missing_ok=True)
+                        total -= size
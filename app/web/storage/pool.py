@@ -0,0 +1,53 @@
+import os
+import threading
+from app.web.config import Config
+from .backends import AzureBlobBackend, LocalDiskBackend
+
+_lock = threading.Lock()
+_storage = None
+
+
+def _build_azure() -> AzureBlobBackend:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from azure.core.pipeline.transport import RequestsTransport
+    from azure.storage.blob import BlobServiceClient
+
+    # NOTE: One keep-alive session for every blob call in the process, sized for parallel transfers:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=Config.STORAGE_POOL_SIZE, pool_maxsize=Config.STORAGE_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    connection_string = f"DefaultEndpointsProtocol=https;AccountName={Config.ACCOUNT_NAME};AccountKey={Config.ACCOUNT_KEY};EndpointSuffix=core.windows.net"
+    blob_service_client = BlobServiceClient.from_connection_string(
+        connection_string,
+        transport=RequestsTransport(session=session, session_owner=False),
+    )
+    return AzureBlobBackend(blob_service_client.get_container_client(Config.CONTAINER_NAME))
+
+
+def get_storage():
+    """
+    The process-wide storage backend, built on first use from
+    STORAGE_BACKEND (azure or local).
+    """
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                if Config.STORAGE_BACKEND == "local":
+                    _storage = LocalDiskBackend(Config.STORAGE_LOCAL_ROOT)
+                else:
+                    _storage = _build_azure()
+    return _storage
+
+
+def _reset_after_fork():
+    # NOTE: Pooled connections must not be shared with forked Celery children:
+    global _lock, _storage
+    _lock = threading.Lock()
+    _storage = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
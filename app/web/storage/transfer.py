@@ -0,0 +1,66 @@
+import base64
+import os
+from concurrent.futures import ThreadPoolExecutor
+from app.web.config import Config
+
+
+def _block_id(index: int) -> str:
+    # NOTE: Azure requires every block ID of a blob to have the same length:
+    return base64.b64encode(f"block-{index:08d}".encode()).decode()
+
+
+def upload_file(backend, name: str, path: str, block_size: int = None, concurrency: int = None,
+                overwrite: bool = False) -> None:
+    """
+    Uploads a local file as concurrently staged blocks, then commits them
+    in order. Files no larger than one block go up in a single request.
+    Each worker reads its own block, so memory is bounded by
+    `concurrency * block_size`. An existing blob is only replaced with
+    `overwrite`, otherwise BlobExistsError is raised.
+    """
+    block_size = block_size or Config.STORAGE_BLOCK_SIZE
+    concurrency = concurrency or Config.STORAGE_CONCURRENCY
+    size = os.path.getsize(path)
+    if size <= block_size:
+        with open(path, "rb") as f:
+            backend.put(name, f.read(), overwrite=overwrite)
+        return
+
+    def stage(index: int) -> str:
+        block_id = _block_id(index)
+        with open(path, "rb") as f:
+            f.seek(index * block_size)
+            backend.stage_block(name, block_id, f.read(block_size))
+        return block_id
+
+    block_count = (size + block_size - 1) // block_size
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="block-upload") as pool:
+        block_ids = list(pool.map(stage, range(block_count)))
+    backend.commit_blocks(name, block_ids, overwrite=overwrite)
+
+
+def download_file(backend, name: str, dest: str, block_size: int = None, concurrency: int = None) -> str:
+    """
+    Downloads a blob with parallel range requests straight into a
+    preallocated file.
+    """
+    block_size = block_size or Config.STORAGE_BLOCK_SIZE
+    concurrency = concurrency or Config.STORAGE_CONCURRENCY
+    size = backend.size(name)
+    with open(dest, "wb") as f:
+        f.truncate(size)
+
+    def fetch(offset: int) -> None:
+        data = backend.read_range(name, offset, min(block_size, size - offset))
+        with open(dest, "r+b") as f:
+            f.seek(offset)
+            f.write(data)
+
+    offsets = range(0, size, block_size)
+    if len(offsets) <= 1:
+        for offset in offsets:
+            fetch(offset)
+        return dest
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="range-download") as pool:
+        list(pool.map(fetch, offsets))
+    return dest
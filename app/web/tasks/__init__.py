@@ -0,0 +1,8 @@
+from flask import current_app
+
+
+def enqueue(task, *args):
+    # NOTE: Without a configured broker (no REDIS_URI) the task runs in-process:
+    if "celery" in current_app.extensions:
+        return task.delay(*args)
+    return task.apply(args=args)
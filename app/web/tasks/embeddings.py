@@ -1,32 +1,129 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Optional
 from celery import shared_task
-from app.web.db.models import Document, AnalyzeResults
+from app.web.db.models import Document, IngestionJob
 from app.web.files import download
 from app.chat import create_emdeddings
 from app.web.csvxls import handle_csvxls
 from app.chat.audio_analyzer import run_audio_analyzer
 from app.web import files
-from app.chat import build_chat, ChatArgs
-from flask import g, current_app
-import uuid
+from app.web.tasks.progress import JobTracker
+from app.web.api import invalidate_cached_answers
 import pprint
-import asyncio
 
+# NOTE: Blob uploads of freshly uploaded files run here, next to parsing and embedding:
+_uploads = ThreadPoolExecutor(max_workers=2, thread_name_prefix="blob-upload")
 
-# @shared_task()
-def process_document(document_id, file_extension):
+
+@shared_task()
+def process_document(document_id, file_extension, job_id=None, local_path=None):
     document = Document.find_by(id=document_id)
+    if job_id:
+        job = IngestionJob.find_by(id=job_id)
+    else:
+        job = IngestionJob.create(document_id=document.id)
+    tracker = JobTracker(job)
+    tracker.start()
+    try:
+        with _source_file(document, tracker, local_path) as source:
+            _process(document, file_extension, tracker, source)
+    except Exception as e:
+        tracker.fail(e)
+        raise
+    finally:
+        # NOTE: Even a failed run may have changed what is indexed for the document:
+        invalidate_cached_answers(document.id)
+    tracker.succeed()
+
+
+class _Source:
+    def __init__(self, path):
+        self.path = path
+        self.upload = None
+        self.upload_seconds = 0.0
+
+    def start_upload(self, document):
+        # NOTE: Read on this thread, the session must not be used from the upload pool:
+        self.target = (document.name, document.user_id)
+        self.upload = _uploads.submit(self._upload)
+
+    def _upload(self):
+        start = perf_counter()
+        try:
+            return files.upload(self.path, *self.target)
+        finally:
+            self.upload_seconds = perf_counter() - start
+
+    def wait_uploaded(self):
+        if self.upload is None:
+            return
+        error = self.upload_error()
+        if error is not None:
+            raise error
+
+    def upload_error(self) -> Optional[Exception]:
+        # NOTE: Waits for the upload, it may still be reading the file:
+        error = self.upload.exception()
+        if error is not None:
+            return error
+        res, status_code = self.upload.result()
+        return Exception(res["message"]) if status_code >= 400 else None
+
+    def retry_upload(self) -> Optional[Exception]:
+        self.upload = _uploads.submit(self._upload)
+        return self.upload_error()
+
+
+@contextmanager
+def _source_file(document, tracker, local_path=None):
+    if local_path is None:
+        # NOTE: Re-processing, the only copy is in blob storage:
+        downloader = download(document.id)
+        try:
+            with tracker.stage("download"):
+                file_path = downloader.download()
+            yield _Source(file_path)
+        finally:
+            downloader.cleanup()
+        return
+
+    if not os.path.exists(local_path):
+        raise FileNotFoundError(f"Spooled upload {local_path} is not visible to this worker, set SHARED_UPLOAD_SPOOL=false")
+    source = _Source(local_path)
+    source.start_upload(document)
+    try:
+        yield source
+    finally:
+        error = source.upload_error()
+        if error is not None:
+            # NOTE: Once more from the spool, without a blob the document can't be
+            # re-processed or downloaded later:
+            error = source.retry_upload()
+        tracker.record("upload", source.upload_seconds)
+        os.remove(local_path)
+        if error is not None:
+            # NOTE: Fails the job and the task even when processing succeeded, a
+            # processing error in flight stays attached as the context:
+            raise Exception(f"Upload of {source.target[0]} failed: {error}")
+
+
+def _process(document, file_extension, tracker, source):
     # NOTE: Handling differenet type of files:
-    with download(document.id) as file_path:
-        print("Running embeddings::::")
-        if file_extension in ["txt", "docx", "pdf", "doc"]:
-            create_emdeddings(document.id, file_path, file_extension)
-        elif file_extension in ["csv", "xls", "xlsx"]:
-            handle_csvxls(document.name, document.user_id, file_path, file_extension)
-        elif file_extension in ["wav", "mp3"]:
-            print("Running audio analyzer::" + f"analysis_results/{document.name.split(".")[0]}.txt")
-            download_url = files.create_download_url(document.id);
-            pprint.pp(download_url)
-            run_audio_analyzer(download_url[0], f"analysis_results/{document.name.split(".")[0]}.txt", document.id)
-
-        else:
-            raise ValueError("Invalid file extension")
+    print("Running embeddings::::")
+    if file_extension in ["txt", "docx", "pdf", "doc"]:
+        create_emdeddings(document.id, source.path, file_extension, tracker)
+    elif file_extension in ["csv", "xls", "xlsx"]:
+        with tracker.stage("parse"):
+            handle_csvxls(document.name, document.user_id, source.path, file_extension)
+    elif file_extension in ["wav", "mp3"]:
+        # NOTE: The speech service reads the audio from blob storage, so it has to be there first:
+        source.wait_uploaded()
+        print("Running audio analyzer::" + f"analysis_results/{document.name.split(".")[0]}.txt")
+        download_url = files.create_download_url(document.id);
+        pprint.pp(download_url)
+        run_audio_analyzer(download_url[0], f"analysis_results/{document.name.split(".")[0]}.txt", document.id, document.user_id, tracker)
+    else:
+        raise ValueError("Invalid file extension")
@@ -1,10 +1,10 @@
 
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
+from app.chat.llms.registry import get_llm
 from langchain_core.prompts import PromptTemplate
 import json
 
-llm = ChatOpenAI(model="gpt-4o", temperature=0.6)
+llm = get_llm("gpt-4o", temperature=0.6)
 
 prompt = PromptTemplate(
     template="""You are an assistant for Jira ticket. 
@@ -0,0 +1,53 @@
+from datetime import datetime
+from time import monotonic
+from app.web.db import db
+from app.web.db.models import IngestionJob
+from app.chat.progress import ProgressTracker
+
+
+class JobTracker(ProgressTracker):
+    """
+    Persists ingestion progress onto an IngestionJob row. Counter updates
+    are throttled to one commit per `flush_interval` seconds so large
+    documents don't turn every chunk into a database write.
+    """
+
+    def __init__(self, job: IngestionJob, flush_interval: float = 1.0):
+        super().__init__()
+        self.job = job
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+
+    def start(self) -> None:
+        self.job.update(status="running", started_on=datetime.utcnow(), error=None)
+
+    def succeed(self) -> None:
+        self.job.status = "succeeded"
+        self.job.finished_on = datetime.utcnow()
+        self.on_update(force=True)
+
+    def fail(self, error: Exception) -> None:
+        db.session.rollback()
+        self.job.status = "failed"
+        self.job.error = str(error)
+        self.job.finished_on = datetime.utcnow()
+        self.on_update(force=True)
+
+    def on_stage(self, name: str) -> None:
+        self.job.stage = name
+        self.on_update()
+
+    def on_update(self, force: bool = False) -> None:
+        now = monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        self.job.update(
+            pages=self.counts.get("pages", 0),
+            chunks=self.counts.get("chunks", 0),
+            vectors=self.counts.get("vectors", 0),
+            tokens=self.counts.get("tokens", 0),
+            skipped=self.counts.get("skipped", 0),
+            deleted=self.counts.get("deleted", 0),
+            timings={name: round(seconds, 3) for name, seconds in self.timings.items()},
+        )
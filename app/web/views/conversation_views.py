@@ -1,9 +1,13 @@
+import math
 import pprint
 import asyncio
 from flask import Blueprint, g, request, Response, jsonify, stream_with_context
 from app.web.hooks import login_required, load_model
 from app.web.db.models import Document, Conversation, AnalyzeResults
 from app.chat import build_chat, ChatArgs
+from app.chat.chains.streamable import StreamBusy
+from app.web.sse import SSE_COALESCE_SECONDS, sse_response, token_events
+from app.chat.embeddings import cache_stats
 from app.chat.csv import build_csv_agent, build_query
 
 
@@ -26,6 +30,41 @@ def create_conversation():
     return conversation.as_dict()
 
 
+@bp.route("/cache-stats", methods=["GET"])
+@login_required
+def show_cache_stats():
+    return cache_stats()
+
+
+# NOTE: Bounds of the optional retrieval tuning, values outside are clamped:
+RETRIEVAL_LIMITS = {
+    "k": (int, 1, 20),
+    "fetch_k": (int, 1, 100),
+    "mmr_lambda": (float, 0.0, 1.0),
+    "context_tokens": (int, 0, 16000),
+}
+
+
+def parse_retrieval(retrieval):
+    if not isinstance(retrieval, dict):
+        raise ValueError("retrieval must be an object")
+    args = {}
+    for key, (kind, low, high) in RETRIEVAL_LIMITS.items():
+        value = retrieval.get(key)
+        if value is None:
+            continue
+        # NOTE: bool is an int subclass, true is not a valid k:
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) \
+                or (kind is int and value != int(value)):
+            raise ValueError(f"retrieval.{key} must be {'an integer' if kind is int else 'a number'}")
+        args[key] = kind(min(max(value, low), high))
+    if "rerank" in retrieval:
+        if not isinstance(retrieval["rerank"], bool):
+            raise ValueError("retrieval.rerank must be a boolean")
+        args["rerank"] = retrieval["rerank"]
+    return args
+
+
 @bp.route("/<string:conversation_id>/messages", methods=["POST"])
 @login_required
 @load_model(Conversation)
@@ -33,6 +72,11 @@ def create_message(conversation):
     input = request.json.get("input")
     docList = request.json.get("docList")
     template = request.json.get("template")
+    # NOTE: Optional retrieval tuning, any of k, fetch_k, mmr_lambda, rerank and context_tokens:
+    try:
+        retrieval = parse_retrieval(request.json.get("retrieval") or {})
+    except ValueError as e:
+        return {"message": str(e)}, 400
     streaming = request.args.get("stream", False)
     query = f"{input} Additional Instructions: {template}"
     document = conversation.document
@@ -45,6 +89,8 @@ def create_message(conversation):
         conversation_id=conversation.id,
         document_id=docIdList,
         streaming=streaming,
+        template=template,
+        **retrieval,
         metadata={
             "conversation_id": conversation.id,
             "document_id": document.id,
@@ -57,9 +103,11 @@ def create_message(conversation):
             return "Chat not yet implemented!"
         
         if streaming:
-            return Response(
-                stream_with_context(chat.stream(query)), mimetype="text/event-stream"
-            )
+            try:
+                tokens = chat.stream(query, idle_interval=SSE_COALESCE_SECONDS)
+            except StreamBusy as e:
+                return {"message": str(e)}, 503, {"Retry-After": "2"}
+            return sse_response(token_events(tokens))
         else:
             return jsonify({"role":"assistant", "content": chat.run(query)})
     else:
@@ -1,12 +1,21 @@
+import json
+import os
+import time
 from flask import Blueprint, g, jsonify, request
-from app.web.db.models import Document
+from app.web.config import Config
+from app.web.db import db
+from app.web.db.models import Document, IngestionJob
 from app.web.hooks import login_required, load_model, handle_file_upload
 from app.web import files
+from app.web.tasks import enqueue
 from app.web.tasks.embeddings import process_document
+from app.web.sse import SSE_HEARTBEAT_SECONDS, comment, event, sse_response
 import pprint
 
 bp = Blueprint('documents', __name__, url_prefix='/api/pdfs')
 
+PROGRESS_POLL_SECONDS = 1.0
+
 
 @bp.route('/', methods=['GET'])
 @login_required
@@ -22,24 +31,77 @@ def list():
 @login_required
 @handle_file_upload
 def upload_file(file_id, file_path, file_name, file_size, file_extension):
-    res, status_code = files.upload(file_path, file_name)
-
-    if status_code >= 400:
-        return res, status_code
+    local_path = file_path
+    if files.exists(file_name, g.user.id):
+        # NOTE: Checked here too, with a shared spool the blob upload only happens on the worker:
+        os.remove(file_path)
+        return {"message": f"A file named {file_name} already exists"}, 409
+    if not Config.SHARED_UPLOAD_SPOOL:
+        res, status_code = files.upload(file_path, file_name, g.user.id)
+        os.remove(file_path)
+        if status_code >= 400:
+            return res, status_code
+        local_path = None
     doc = Document.create(id=file_id, name=file_name, document_ext= file_extension, user_id=g.user.id)
-    try:
-        process_document(doc.id,file_extension)
-    except Exception as e:
-        print(e)
-    return doc.as_dict()
+    job = IngestionJob.create(document_id=doc.id)
+    # NOTE: Ingestion runs on the Celery worker, the upload returns as soon as the job is queued.
+    # With a shared spool the worker parses the local file and uploads the blob alongside:
+    enqueue(process_document, doc.id, file_extension, job.id, local_path)
+    return {**doc.as_dict(), "job": job.as_dict()}
 
 @bp.route("/<string:document_id>", methods=['GET'])
 @login_required
 @load_model(Document)
 def show(document):
+    job = document.ingestion_jobs[0] if document.ingestion_jobs else None
     return jsonify(
         {
             "pdf": document.as_dict(),
             "download_url": files.create_download_url(document.id),
+            "job": job.as_dict() if job else None,
         }
-    )
\ No newline at end of file
+    )
+
+@bp.route("/<string:document_id>/reprocess", methods=['POST'])
+@login_required
+@load_model(Document)
+def reprocess(document):
+    # NOTE: Chunk IDs are deterministic, so only changed chunks are embedded again:
+    job = IngestionJob.create(document_id=document.id)
+    enqueue(process_document, document.id, document.document_ext, job.id)
+    return job.as_dict()
+
+@bp.route("/<string:document_id>/progress", methods=['GET'])
+@login_required
+@load_model(Document)
+def progress(document):
+    document_id = document.id
+
+    def events():
+        last = None
+        last_write = time.monotonic()
+        while True:
+            # NOTE: Drop the identity map so every poll sees the worker's latest commit:
+            db.session.expire_all()
+            job = db.session.execute(
+                db.select(IngestionJob)
+                .filter_by(document_id=document_id)
+                .order_by(IngestionJob.created_on.desc())
+            ).scalars().first()
+            if job is None:
+                yield event(json.dumps({"message": "No ingestion job"}), "error")
+                return
+            payload = json.dumps(job.as_dict(), default=str)
+            if payload != last:
+                last = payload
+                last_write = time.monotonic()
+                yield event(payload, "progress")
+            elif time.monotonic() - last_write >= SSE_HEARTBEAT_SECONDS:
+                last_write = time.monotonic()
+                yield comment("heartbeat")
+            if job.finished:
+                yield event(payload, "done")
+                return
+            time.sleep(PROGRESS_POLL_SECONDS)
+
+    return sse_response(events())
@@ -0,0 +1,39 @@
+"""
+Reports chunk counts and token totals per chunking strategy and size,
+to tune embedding cost against retrieval granularity.
+
+    python -m benchmarks.chunking_report manual.pdf notes.docx --sizes 256 512 1024
+"""
+import argparse
+import os
+from app.chat.chunking import build_chunker, CHUNK_OVERLAP_TOKENS
+from app.chat.create_embeddings import build_loader
+
+
+def report(file_path: str, chunk_size: int, chunk_overlap: int) -> dict:
+    extension = os.path.splitext(file_path)[1].lstrip(".").lower()
+    chunker = build_chunker(extension, chunk_size, chunk_overlap)
+    for page in build_loader(file_path, extension).lazy_load():
+        chunker.split_documents([page])
+    return {"strategy": type(chunker).__name__, **chunker.report.as_dict()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 512, 1024])
+    parser.add_argument("--overlap", type=int, default=CHUNK_OVERLAP_TOKENS)
+    args = parser.parse_args()
+
+    print(f"{'file':<30} {'strategy':<18} {'size':>5} {'pages':>6} {'chunks':>7} {'tokens':>9} {'mean':>7} {'max':>5}")
+    for file_path in args.files:
+        for size in args.sizes:
+            row = report(file_path, size, min(args.overlap, size // 2))
+            print(
+                f"{os.path.basename(file_path)[:30]:<30} {row['strategy']:<18} {size:>5} {row['pages']:>6} "
+                f"{row['chunks']:>7} {row['tokens']:>9} {row['mean_tokens']:>7} {row['max_tokens']:>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
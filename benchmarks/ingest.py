@@ -0,0 +1,235 @@
+"""
+End-to-end ingestion benchmark. Runs the real `process_document` path
+(spool, upload, parse, chunk, embed, upsert) against local blob storage,
+a throwaway SQLite database, deterministic fake embeddings and an
+in-memory vector index, so it needs no network access or API keys.
+
+    python -m benchmarks.ingest --out results.json
+    python -m benchmarks.ingest --types pdf docx --sizes large --embed-latency-ms 150
+    python -m benchmarks.ingest --compare baseline.json --out results.json
+
+Each case runs in a fresh process so peak RSS is per case.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+SCHEMA_VERSION = 1
+SIZES = {"small": 10, "medium": 100, "large": 500}
+TYPES = ["pdf", "docx", "txt", "csv", "transcript"]
+# NOTE: CSVs are loaded into SQLite for the CSV agent, never chunked or embedded:
+NOT_APPLICABLE = {"csv": ["chunk", "embed", "upsert"]}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # NOTE: ru_maxrss is in bytes on macOS and kilobytes everywhere else:
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(kind: str, size: str, workdir: str, settings: dict) -> dict:
+    os.chdir(workdir)
+    os.makedirs("instance", exist_ok=True)
+    os.environ.update({
+        "STORAGE_BACKEND": "local",
+        "STORAGE_LOCAL_ROOT": os.path.join(workdir, "blobs"),
+        "UPLOAD_SPOOL_DIR": os.path.join(workdir, "uploads"),
+        "SOURCE_CACHE_MAX_BYTES": "0",
+        "EMBEDDING_CACHE": "sqlite" if settings["with_cache"] else "none",
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, "embeddings.db"),
+    })
+    os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+    from flask import Flask
+    from app.web.db import db
+    from app.web.db.models import User, Document, IngestionJob
+    from app.chat.embeddings import set_embeddings
+    from app.chat.embeddings.cache import CachedEmbeddings, build_embedding_store
+    from app.chat.vector_stores import set_index
+    from benchmarks.standins import FakeEmbeddings, InMemoryIndex
+    from benchmarks.synthetic import writers
+
+    embeddings = FakeEmbeddings(settings["dimensions"], settings["embed_latency_ms"] / 1000)
+    store = build_embedding_store()
+    set_embeddings(CachedEmbeddings(embeddings, store, "fake") if store else embeddings)
+    index = InMemoryIndex(settings["upsert_latency_ms"] / 1000)
+    set_index(index)
+
+    app = Flask("benchmarks")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    db.init_app(app)
+
+    ext = "txt" if kind == "transcript" else kind
+    file_path = writers[kind](os.path.join(workdir, f"source.{ext}"), SIZES[size])
+    file_bytes = os.path.getsize(file_path)
+
+    with app.app_context():
+        db.create_all()
+        user = User.create(email=f"bench-{kind}-{size}@example.com", password="bench")
+        doc = Document.create(name=f"bench-{size}.{ext}", document_ext=ext, user_id=user.id)
+        job = IngestionJob.create(document_id=doc.id)
+
+        start = time.perf_counter()
+        if kind == "transcript":
+            from app.chat.audio_analyzer.audio_embeddings import audio_embeddings
+            from app.web.tasks.progress import JobTracker
+
+            tracker = JobTracker(job)
+            tracker.start()
+            with tracker.stage("parse"):
+                tracker.incr(pages=1)
+            audio_embeddings(file_path, doc.id, tracker)
+            tracker.succeed()
+        else:
+            from app.web.tasks.embeddings import process_document
+
+            os.makedirs(os.environ["UPLOAD_SPOOL_DIR"], exist_ok=True)
+            spooled = shutil.copy(file_path, os.path.join(os.environ["UPLOAD_SPOOL_DIR"], doc.id))
+            process_document(doc.id, ext, job.id, spooled)
+        seconds = time.perf_counter() - start
+
+        job = IngestionJob.find_by(id=job.id)
+        rows = _table_rows(doc) if kind == "csv" else None
+        return {
+            "type": kind,
+            "size": size,
+            "file_bytes": file_bytes,
+            "status": job.status,
+            "pages": job.pages,
+            "chunks": job.chunks,
+            "tokens": job.tokens,
+            "vectors": job.vectors,
+            "seconds": round(seconds, 4),
+            "pages_per_second": round(job.pages / seconds, 2),
+            "chunks_per_second": round(job.chunks / seconds, 2),
+            "rows": rows,
+            "rows_per_second": round(rows / seconds, 2) if rows is not None else None,
+            "not_applicable": NOT_APPLICABLE.get(kind, []),
+            "embed_requests": embeddings.requests,
+            "upsert_requests": index.requests,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "stages": job.timings or {},
+        }
+
+
+def _table_rows(doc) -> int:
+    # NOTE: Where handle_csvxls writes the table, relative to the working directory:
+    import sqlite3
+
+    name = doc.name.split(".")[0]
+    with sqlite3.connect(f"instance/{doc.user_id}_{name}.db") as connection:
+        return connection.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+
+
+def run_case(kind: str, size: str, settings: dict) -> dict:
+    with tempfile.TemporaryDirectory(prefix="ingest-bench-") as workdir:
+        # NOTE: A spawned process starts without any of the parent's imports, pools or RSS:
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            return pool.apply(_run_case, (kind, size, workdir, settings))
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _settings(args) -> dict:
+    from app.chat.chunking import CHUNK_SIZE_TOKENS, CHUNK_OVERLAP_TOKENS
+    from app.chat.ingest import EMBED_BATCH_SIZE
+    from app.chat.loaders.pdf import PDF_EXTRACT_WORKERS
+
+    return {
+        "dimensions": args.dimensions,
+        "embed_latency_ms": args.embed_latency_ms,
+        "upsert_latency_ms": args.upsert_latency_ms,
+        "with_cache": args.with_cache,
+        "chunk_size_tokens": CHUNK_SIZE_TOKENS,
+        "chunk_overlap_tokens": CHUNK_OVERLAP_TOKENS,
+        "embed_batch_size": EMBED_BATCH_SIZE,
+        "pdf_extract_workers": PDF_EXTRACT_WORKERS,
+        "upsert_batch_size": os.getenv("UPSERT_BATCH_SIZE"),
+        "upsert_max_in_flight": os.getenv("UPSERT_MAX_IN_FLIGHT"),
+    }
+
+
+def _delta(current: float, previous: float) -> str:
+    if not previous:
+        return "n/a"
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
+def report(results: list, baseline: dict = None):
+    previous = {(r["type"], r["size"]): r for r in (baseline or {}).get("results", [])}
+    header = f"{'type':<11} {'size':<7} {'pages':>6} {'chunks':>7} {'seconds':>9} {'pages/s':>9} {'chunks/s':>9} {'rss MB':>8}"
+    if baseline:
+        header += f" {'Δ chunks/s':>11} {'Δ rss':>8}"
+    print(header)
+    for result in results:
+        line = (
+            f"{result['type']:<11} {result['size']:<7} {result['pages']:>6} {result['chunks']:>7} "
+            f"{result['seconds']:>9.3f} {result['pages_per_second']:>9.1f} {result['chunks_per_second']:>9.1f} "
+            f"{result['peak_rss_mb']:>8.1f}"
+        )
+        if baseline:
+            before = previous.get((result["type"], result["size"]), {})
+            line += (
+                f" {_delta(result['chunks_per_second'], before.get('chunks_per_second')):>11}"
+                f" {_delta(result['peak_rss_mb'], before.get('peak_rss_mb')):>8}"
+            )
+        print(line)
+        stages = dict(result["stages"])
+        stages.update({name: "n/a" for name in result.get("not_applicable", [])})
+        if result.get("rows") is not None:
+            stages.update(rows=result["rows"], **{"rows/s": result["rows_per_second"]})
+        if stages:
+            print("    " + "  ".join(f"{name}={value}" for name, value in sorted(stages.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--types", nargs="+", choices=TYPES, default=TYPES)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="simulated latency per embeddings request")
+    parser.add_argument("--upsert-latency-ms", type=float, default=0.0, help="simulated latency per upsert request")
+    parser.add_argument("--with-cache", action="store_true", help="wrap the fake embeddings in the SQLite embedding cache")
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="a previous --out file to report deltas against")
+    args = parser.parse_args()
+
+    settings = _settings(args)
+    results = [run_case(kind, size, settings) for size in args.sizes for kind in args.types]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "schema_version": SCHEMA_VERSION,
+                "created_on": datetime.now(timezone.utc).isoformat(),
+                "git_commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "settings": settings,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compares serial and parallel PDF text extraction.
+
+    python -m benchmarks.pdf_extraction --pages 400 --workers 2 4 8
+    python -m benchmarks.pdf_extraction path/to/file.pdf
+"""
+import argparse
+import os
+import tempfile
+import time
+from app.chat.loaders.pdf import ParallelPyPDFLoader
+from benchmarks.synthetic import write_pdf
+
+
+def run(file_path: str, workers: int, pages_per_range: int) -> dict:
+    start = time.perf_counter()
+    pages = 0
+    chars = 0
+    for page in ParallelPyPDFLoader(file_path, workers=workers, pages_per_range=pages_per_range).lazy_load():
+        pages += 1
+        chars += len(page.page_content)
+    elapsed = time.perf_counter() - start
+    return {"workers": workers, "pages": pages, "chars": chars, "seconds": elapsed, "pages_per_second": pages / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", help="PDF to extract; a synthetic one is generated if omitted")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument("--pages-per-range", type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = args.file or write_pdf(os.path.join(tmpdir, "synthetic.pdf"), args.pages)
+        baseline = run(file_path, 1, args.pages_per_range)
+        print(f"{'workers':>8} {'pages':>6} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+        for result in [baseline] + [run(file_path, w, args.pages_per_range) for w in sorted(set(args.workers)) if w > 1]:
+            assert result["chars"] == baseline["chars"], "parallel extraction produced different text"
+            print(
+                f"{result['workers']:>8} {result['pages']:>6} {result['seconds']:>9.3f} "
+                f"{result['pages_per_second']:>9.1f} {baseline['seconds'] / result['seconds']:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
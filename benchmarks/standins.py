@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic unit vectors seeded from the text's hash, with an
+    optional per-request latency to stand in for the embeddings API.
+    """
+
+    def __init__(self, dimensions: int = 1536, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.requests = 0
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimensions).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def _matches_filter(metadata: Dict, filter: Optional[Dict]) -> bool:
+    for key, condition in (filter or {}).items():
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class InMemoryIndex:
+    """
+    The subset of the Pinecone Index API used by ingestion and retrieval,
+    held in process memory.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.namespaces: Dict[str, Dict[str, tuple]] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _namespace(self, namespace: Optional[str]) -> Dict[str, tuple]:
+        return self.namespaces.setdefault(namespace or "", {})
+
+    def upsert(self, vectors, namespace: Optional[str] = None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            records = self._namespace(namespace)
+            for id, values, metadata in vectors:
+                records[id] = (np.asarray(values, dtype=np.float32), dict(metadata))
+        return {"upserted_count": len(vectors)}
+
+    def delete(self, ids: List[str], namespace: Optional[str] = None, **kwargs):
+        with self._lock:
+            records = self._namespace(namespace)
+            for id in ids:
+                records.pop(id, None)
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None, **kwargs):
+        records = self._namespace(namespace)
+        return SimpleNamespace(vectors={
+            id: SimpleNamespace(id=id, values=records[id][0].tolist(), metadata=records[id][1])
+            for id in ids if id in records
+        })
+
+    def query(self, vector, top_k: int = 4, filter: Optional[Dict] = None, namespace: Optional[str] = None,
+              include_metadata: bool = False, include_values: bool = False, **kwargs):
+        records = [
+            (id, values, metadata)
+            for id, (values, metadata) in self._namespace(namespace).items()
+            if _matches_filter(metadata, filter)
+        ]
+        if not records:
+            return SimpleNamespace(matches=[])
+        scores = np.stack([values for _, values, _ in records]) @ np.asarray(vector, dtype=np.float32)
+        top = np.argsort(-scores)[:top_k]
+        return SimpleNamespace(matches=[
+            SimpleNamespace(
+                id=records[i][0],
+                score=float(scores[i]),
+                metadata=records[i][2] if include_metadata else None,
+                values=records[i][1].tolist() if include_values else None,
+            )
+            for i in top
+        ])
+
+    def describe_index_stats(self, **kwargs):
+        return {"namespaces": {name: {"vector_count": len(records)} for name, records in self.namespaces.items()}}
@@ -0,0 +1,125 @@
+import random
+
+WORDS = (
+    "agreement party clause liability notice term payment invoice schedule "
+    "service provider customer warranty obligation section article breach "
+    "confidential termination renewal period delivery acceptance criteria "
+    "requirement system user report data record account transaction error"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text.capitalize() + "."
+
+
+def paragraph(rng: random.Random, sentences: int = 5) -> str:
+    return " ".join(sentence(rng) for _ in range(sentences))
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 45, seed: int = 0) -> str:
+    """
+    Writes a text-only PDF by hand so benchmarks need no PDF authoring
+    dependency. Each page is `lines_per_page` lines of Helvetica text.
+    """
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for number in range(pages):
+        lines = [f"Page {number + 1}. Section {number + 1}.1"]
+        lines += [sentence(rng, 10) for _ in range(lines_per_page - 1)]
+        ops = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+        ops += [f"({_pdf_escape(line)}) Tj T*" for line in lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids),
+        pages,
+    )
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return path
+
+
+def write_txt(path: str, pages: int, paragraphs_per_page: int = 6, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for number in range(pages):
+            f.write(f"Section {number + 1}\n\n")
+            for _ in range(paragraphs_per_page):
+                f.write(paragraph(rng) + "\n\n")
+    return path
+
+
+def write_docx(path: str, pages: int, paragraphs_per_page: int = 6, seed: int = 0) -> str:
+    from docx import Document
+
+    rng = random.Random(seed)
+    document = Document()
+    for number in range(pages):
+        document.add_heading(f"Section {number + 1}", level=2)
+        for _ in range(paragraphs_per_page):
+            document.add_paragraph(paragraph(rng))
+    document.save(path)
+    return path
+
+
+def write_csv(path: str, pages: int, rows_per_page: int = 50, seed: int = 0) -> str:
+    import csv
+
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "account", "amount", "status", "note"])
+        for row in range(pages * rows_per_page):
+            writer.writerow([
+                row,
+                f"ACC-{rng.randint(1000, 9999)}",
+                round(rng.uniform(1, 10_000), 2),
+                rng.choice(["open", "paid", "overdue"]),
+                sentence(rng, 8),
+            ])
+    return path
+
+
+def write_transcript(path: str, pages: int, turns_per_page: int = 20, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for turn in range(pages * turns_per_page):
+            # NOTE: The labels the audio analyzer writes, see format_turns:
+            f.write(f"Speaker {turn % 2 + 1}: {sentence(rng, rng.randint(6, 30))}\n")
+    return path
+
+
+writers = {
+    "pdf": write_pdf,
+    "txt": write_txt,
+    "docx": write_docx,
+    "csv": write_csv,
+    "transcript": write_transcript,
+}
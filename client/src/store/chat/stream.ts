@@ -140,7 +140,7 @@ export const sendMessage = async (userMessage: Message, opts: MessageOptions)=>
 			if (response.status >= 400) {
 				await readError(response.status, reader);
 			} else {
-				await readResponse(reader, responseMessage);		
+				await readEvents(reader, responseMessage);
 			}
 			set({ loading: false });
 		}
@@ -171,6 +171,56 @@ const readResponse = async (
 	}
 };
 
+// Server-sent events: frames end with a blank line, "data:" lines carry the
+// payload and lines starting with ":" are heartbeat comments.
+const readEvents = async (
+	reader: ReadableStreamDefaultReader<Uint8Array>,
+	responseMessage: Message
+) => {
+	const decoder = new TextDecoder();
+	let buffer = '';
+
+	const handleFrame = (frame: string) => {
+		let name = 'message';
+		const data: string[] = [];
+		for (const line of frame.split('\n')) {
+			if (line.startsWith(':')) {
+				continue;
+			} else if (line.startsWith('event:')) {
+				name = line.slice(6).trim();
+			} else if (line.startsWith('data:')) {
+				data.push(line.slice(5).replace(/^ /, ''));
+			}
+		}
+		if (data.length === 0) {
+			return;
+		}
+		const payload = JSON.parse(data.join('\n'));
+		if (name === 'token' && responseMessage.id) {
+			_appendResponse(responseMessage.id, payload.text);
+		} else if (name === 'error') {
+			set({ error: getErrorMessage(payload) });
+		}
+	};
+
+	while (true) {
+		const { done, value } = await reader.read();
+		if (done) {
+			break;
+		}
+		buffer += decoder.decode(value, { stream: true }).replace(/\r\n?/g, '\n');
+		let end = buffer.indexOf('\n\n');
+		while (end !== -1) {
+			handleFrame(buffer.slice(0, end));
+			buffer = buffer.slice(end + 2);
+			end = buffer.indexOf('\n\n');
+		}
+	}
+	if (buffer.trim()) {
+		handleFrame(buffer);
+	}
+};
+
 const readError = async (statusCode: number, reader: ReadableStreamDefaultReader<Uint8Array>) => {
 	let inProgress = true;
 	let message = '';
@@ -0,0 +1,21 @@
+import importlib
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_isolated(name: str):
+    """
+    Imports one module of the app without running the `__init__` of the
+    packages above it, which load the whole app and all its dependencies.
+    """
+    parts = name.split(".")
+    for depth in range(1, len(parts)):
+        package = ".".join(parts[:depth])
+        if package not in sys.modules:
+            module = types.ModuleType(package)
+            module.__path__ = [str(ROOT.joinpath(*parts[:depth]))]
+            sys.modules[package] = module
+    return importlib.import_module(name)
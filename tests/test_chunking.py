@@ -0,0 +1,40 @@
+import pytest
+from isolated import import_isolated
+
+strategies = import_isolated("app.chat.chunking.strategies")
+SPEAKER_TURN, speaker_turns = strategies.SPEAKER_TURN, strategies.speaker_turns
+
+
+def test_speaker_turn_matches_transcriber_labels():
+    assert SPEAKER_TURN.match("Speaker 1: Thanks for calling.")
+    assert SPEAKER_TURN.match("Speaker 12: Hello.")
+
+
+@pytest.mark.parametrize("line", [
+    "Note: the deposit is refundable.",
+    "Summary: three open issues.",
+    "Step One: unplug the router.",
+    "Agent Smith: hello",
+])
+def test_speaker_turn_ignores_prose_labels(line):
+    assert not SPEAKER_TURN.match(line)
+
+
+def test_speaker_turns_keep_labelled_turns_together():
+    text = "\n".join([
+        "Speaker 1: My order has not arrived.",
+        "Note: it was shipped on Monday.",
+        "Speaker 2: Let me check the tracking number.",
+        "",
+        "Speaker 1: Thanks.",
+    ])
+
+    assert speaker_turns(text) == [
+        "Speaker 1: My order has not arrived. Note: it was shipped on Monday.",
+        "Speaker 2: Let me check the tracking number.",
+        "Speaker 1: Thanks.",
+    ]
+
+
+def test_unlabelled_transcript_is_one_turn_per_line():
+    assert speaker_turns("first line\nsecond line\n") == ["first line", "second line"]
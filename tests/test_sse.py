@@ -0,0 +1,128 @@
+import json
+import pytest
+from isolated import import_isolated
+
+sse = import_isolated("app.web.sse")
+token_events = sse.token_events
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sse.time, "perf_counter", clock)
+    return clock
+
+
+def timed(clock, steps):
+    # NOTE: Each step is (seconds to wait, token), "" being an idle tick:
+    for wait, token in steps:
+        clock.now += wait
+        yield token
+
+
+def parse(frames):
+    events = []
+    for frame in frames:
+        if frame.startswith(":"):
+            events.append(("comment", frame[2:].strip()))
+            continue
+        name, data = None, []
+        for line in frame.strip("\n").split("\n"):
+            if line.startswith("event: "):
+                name = line[len("event: "):]
+            elif line.startswith("data: "):
+                data.append(line[len("data: "):])
+        events.append((name, json.loads("\n".join(data))))
+    return events
+
+
+def test_coalesces_tokens_by_time(clock):
+    steps = [(0.01, "a"), (0.01, "b"), (0.04, "c"), (0.01, "d"), (0.06, "")]
+    events = parse(token_events(timed(clock, steps), coalesce_seconds=0.05, coalesce_chars=100))
+
+    assert events[:2] == [("token", {"text": "abc"}), ("token", {"text": "d"})]
+    assert events[2][0] == "done"
+    assert events[2][1]["tokens"] == 4
+    assert events[2][1]["frames"] == 2
+
+
+def test_coalesces_tokens_by_size(clock):
+    steps = [(0.001, "abc")] * 5
+    events = parse(token_events(timed(clock, steps), coalesce_seconds=10, coalesce_chars=6))
+
+    assert [event for event in events if event[0] == "token"] == [
+        ("token", {"text": "abcabc"}),
+        ("token", {"text": "abcabc"}),
+        ("token", {"text": "abc"}),
+    ]
+
+
+def test_sends_heartbeat_when_idle(clock):
+    steps = [(0.5, ""), (0.6, ""), (0.1, "a"), (1.1, "")]
+    events = parse(token_events(timed(clock, steps), coalesce_seconds=0.05, heartbeat_seconds=1))
+
+    assert events[0] == ("comment", "heartbeat")
+    assert events[1] == ("token", {"text": "a"})
+    assert events[2] == ("comment", "heartbeat")
+    assert events[3][0] == "done"
+
+
+def test_closes_token_stream_when_client_disconnects(clock):
+    closed = []
+
+    def tokens():
+        try:
+            while True:
+                clock.now += 1
+                yield "a"
+        finally:
+            closed.append(True)
+
+    # NOTE: Held here, as the view holds it, so garbage collection cannot close it:
+    stream = tokens()
+    events = token_events(stream, coalesce_seconds=0.5)
+    next(events)
+    events.close()
+
+    assert closed == [True]
+
+
+def test_reports_token_stream_failure_as_error_event(clock):
+    def tokens():
+        yield "partial"
+        raise RuntimeError("index unavailable")
+
+    events = parse(token_events(tokens(), coalesce_seconds=10))
+
+    assert events == [
+        ("token", {"text": "partial"}),
+        ("error", {"message": "index unavailable"}),
+    ]
+
+
+def test_reports_chain_failure_as_error_event():
+    flask = pytest.importorskip("flask")
+    pytest.importorskip("langchain")
+    from app.chat.chains.streamable import StreamableChain
+
+    class FailingChain(StreamableChain):
+        def __call__(self, input, callbacks):
+            callbacks[0].on_llm_new_token("partial")
+            raise RuntimeError("index unavailable")
+
+    with flask.Flask(__name__).app_context():
+        tokens = FailingChain().stream("question", idle_interval=0.01)
+        events = parse(token_events(tokens, coalesce_seconds=10))
+
+    assert events == [
+        ("token", {"text": "partial"}),
+        ("error", {"message": "index unavailable"}),
+    ]